@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compare the REST and GraphQL course data paths against a Canvas instance.
+
+Loads the current courses and their upcoming assignments with each data
+source, clearing the response cache, the assignment tables and the disk
+cache before every run so each run hits Canvas, and prints the wall time
+and request count per path. The cleared data is fetched again on the next
+start of the app.
+
+Usage:
+    python scripts/benchmark_data_source.py [--runs 3] [--days 30]
+
+Credentials are read from the canannounce configuration (local_settings.py
+or the CANVAS_API_TOKEN / CANVAS_BASE_URL environment variables).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from canannounce.config import canvas_token, canvas_base_url
+from canannounce.core.assignment_store import get_assignment_store
+from canannounce.core.canvas_client import clear_response_caches, get_rate_limit_stats
+from canannounce.core.course_data import DATA_SOURCES, get_courses_with_assignments
+from canannounce.core.disk_cache import get_disk_cache
+
+
+def request_count():
+    return sum(stats['requests'] for stats in get_rate_limit_stats().values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the REST and GraphQL course data paths')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per data source (default: 3)')
+    parser.add_argument('--days', type=int, help='Days ahead to look for assignments (default: UPCOMING_ASSIGNMENT_DAYS)')
+    args = parser.parse_args()
+
+    results = {}
+    for data_source in DATA_SOURCES:
+        timings = []
+        for _ in range(args.runs):
+            clear_response_caches()
+            get_assignment_store().clear()
+            get_disk_cache().clear()
+            requests_before = request_count()
+            start = time.perf_counter()
+            courses, assignments = get_courses_with_assignments(canvas_token, canvas_base_url, days=args.days,
+                                                                data_source=data_source)
+            timings.append(time.perf_counter() - start)
+            requests_made = request_count() - requests_before
+        results[data_source] = (timings, requests_made, len(courses), sum(len(a) for a in assignments.values()))
+
+    print()
+    print(f"{'Source':<10}{'Median (s)':>12}{'Best (s)':>10}{'Requests':>10}{'Courses':>9}{'Assignments':>13}")
+    print("-" * 64)
+    for data_source, (timings, requests_made, courses, assignments) in results.items():
+        print(f"{data_source:<10}{statistics.median(timings):>12.2f}{min(timings):>10.2f}"
+              f"{requests_made:>10}{courses:>9}{assignments:>13}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the quiz question and course title text cleaning.
+
+Builds a synthetic question bank of Canvas-style HTML questions and times,
+per question, the old inline regex cleanup against text_utils.html_to_text,
+and the old per-call regex course code extraction against the precompiled
+text_utils patterns. No Canvas access is needed.
+
+Usage:
+    python scripts/benchmark_text_cleaning.py [--questions 10000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from canannounce.utils.text_utils import html_to_text, extract_course_code, strip_semester
+
+QUESTION_TEMPLATES = [
+    '<p>What is the &amp; difference between {a} and {b}?</p>',
+    '<div><p>Explain the <strong>{a}</strong> structure used in {b} reporting.</p></div>',
+    '<p>Which of these best describes {a}?&nbsp;<span style="color: #333;">(choose one)</span></p>',
+    '<p>Read the passage below.</p><blockquote><p>{a} &ldquo;{b}&rdquo; &#8212; {a}</p></blockquote><p>What is the lede?</p>',
+    'Plain text question about {a} and {b} without markup',
+]
+WORDS = ['inverted pyramid', 'nut graf', 'attribution', 'AP style', 'libel', 'sourcing', 'embargo', 'byline']
+COURSE_NAMES = ['2025FS-JOURN-4734-01', 'JOURN 4734 Fall 2026', 'Multimedia Reporting FA26',
+                'STRAT 280 Spring 2026', 'Special Topics in Journalism']
+
+
+def old_clean_question(question_text):
+    """The cleanup previously inlined in get_next_quiz_question."""
+    import re
+    return re.sub(r'<[^>]+>', '', question_text).strip()
+
+
+def old_course_code(course_name):
+    """The course code extraction previously inlined in calculate_trimmed_title."""
+    import re
+    match = re.search(r'([A-Z]{3,5}-\d{4})', course_name)
+    if match:
+        return match.group(1)
+    match = re.search(r'([A-Z]{3,5})\s*[-\s]\s*(\d{4})', course_name)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    match = re.search(r'([A-Z]{3,5}\s*\d{3,4})', course_name)
+    if match:
+        return match.group(1).replace(' ', '-')
+    clean_name = re.sub(r'\b(Fall|Spring|Summer)\s*\d{4}\b', '', course_name, flags=re.IGNORECASE)
+    clean_name = re.sub(r'\b(FA|SP|SU)\s*\d{2,4}\b', '', clean_name, flags=re.IGNORECASE)
+    clean_name = re.sub(r'^\d{4}[A-Z]{2}-', '', clean_name)
+    return ' '.join(clean_name.split())
+
+
+def new_course_code(course_name):
+    return extract_course_code(course_name) or strip_semester(course_name)
+
+
+def build_question_bank(count):
+    rng = random.Random(0)
+    return [rng.choice(QUESTION_TEMPLATES).format(a=rng.choice(WORDS), b=rng.choice(WORDS))
+            for _ in range(count)]
+
+
+def per_item_us(func, items, repeat):
+    """Best-of-repeat time per item in microseconds."""
+    timings = timeit.repeat(lambda: [func(item) for item in items], number=1, repeat=repeat)
+    return min(timings) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quiz question and course title text cleaning')
+    parser.add_argument('--questions', type=int, default=10000, help='Questions in the synthetic bank (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repeats, best is reported (default: 5)')
+    args = parser.parse_args()
+
+    questions = build_question_bank(args.questions)
+    course_names = COURSE_NAMES * 1000
+
+    rows = [
+        ('question: old regex', per_item_us(old_clean_question, questions, args.repeat)),
+        ('question: html_to_text', per_item_us(html_to_text, questions, args.repeat)),
+        ('course code: old regex', per_item_us(old_course_code, course_names, args.repeat)),
+        ('course code: precompiled', per_item_us(new_course_code, course_names, args.repeat)),
+    ]
+
+    print(f"{args.questions} questions, {len(course_names)} course names")
+    print(f"{'Operation':<28}{'us/item':>10}")
+    print("-" * 38)
+    for name, us in rows:
+        print(f"{name:<28}{us:>10.2f}")
+
+    # Entity decoding is what the old cleanup was missing
+    sample = questions[0]
+    print()
+    print(f"old:  {old_clean_question(sample)!r}")
+    print(f"new:  {html_to_text(sample)!r}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
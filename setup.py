@@ -30,7 +30,7 @@ setup(
         ],
     },
     install_requires=[
-        "flask>=2.0.0",
+        "flask>=2.2.0",
         "requests>=2.25.0",
         "PyPDF2>=3.0.0",
     ],
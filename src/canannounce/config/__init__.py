@@ -18,6 +18,9 @@ ANNOUNCEMENT_NOW = os.environ.get('ANNOUNCEMENT_NOW', 'true').lower() in ('true'
 INCLUDE_QUIZ_QUESTION = os.environ.get('INCLUDE_QUIZ_QUESTION', 'false').lower() in ('true', 'yes', '1')
 QUIZ_QUESTION_PROMPT = os.environ.get('QUIZ_QUESTION_PROMPT', 'Practice Question from Upcoming Quiz')
 
+# Course data source for the course picker: 'rest' or 'graphql'
+DATA_SOURCE = os.environ.get('CANVAS_DATA_SOURCE', 'rest')
+
 # Application paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 STATIC_DIR = BASE_DIR / 'static'
@@ -53,6 +53,12 @@ CONFIG_SETTINGS = {
         'label': 'Quiz Question Prompt',
         'description': 'Text to display before quiz questions',
         'type': 'string'
+    },
+    'DATA_SOURCE': {
+        'value': 'rest',
+        'label': 'Course Data Source',
+        'description': "How course and assignment data is loaded: 'rest' (one request per course) or 'graphql' (one batched query, falls back to REST)",
+        'type': 'string'
     }
 }
 
@@ -65,3 +71,4 @@ UPCOMING_ASSIGNMENT_DAYS = CONFIG_SETTINGS['UPCOMING_ASSIGNMENT_DAYS']['value']
 TINYMCE_API_KEY = CONFIG_SETTINGS['TINYMCE_API_KEY']['value']
 INCLUDE_QUIZ_QUESTION = CONFIG_SETTINGS['INCLUDE_QUIZ_QUESTION']['value']
 QUIZ_QUESTION_PROMPT = CONFIG_SETTINGS['QUIZ_QUESTION_PROMPT']['value']
+DATA_SOURCE = CONFIG_SETTINGS['DATA_SOURCE']['value']
@@ -80,6 +80,7 @@ class SettingsManager:
             'TINYMCE_API_KEY': getattr(local_settings, 'TINYMCE_API_KEY', ''),
             'INCLUDE_QUIZ_QUESTION': getattr(local_settings, 'INCLUDE_QUIZ_QUESTION', True),
             'QUIZ_QUESTION_PROMPT': getattr(local_settings, 'QUIZ_QUESTION_PROMPT', 'Practice Question from Upcoming Quiz'),
+            'DATA_SOURCE': getattr(local_settings, 'DATA_SOURCE', 'rest'),
         }
 
         self._default_settings = {}
@@ -105,6 +106,7 @@ class SettingsManager:
             'TINYMCE_API_KEY': '',
             'INCLUDE_QUIZ_QUESTION': True,
             'QUIZ_QUESTION_PROMPT': 'Practice Question from Upcoming Quiz',
+            'DATA_SOURCE': 'rest',
         }
 
     def _load_user_settings(self):
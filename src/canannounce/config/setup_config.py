@@ -88,6 +88,9 @@ QUIZ_QUESTION_PROMPT = "{quiz_prompt}"
 # Announcement Settings
 ANNOUNCEMENT_NOW = {announcement_now}
 
+# Course data source: "rest" or "graphql" (one batched query, falls back to REST)
+DATA_SOURCE = "rest"
+
 # Web Interface Settings
 WEB_PORT = 5000
 WEB_HOST = "127.0.0.1"
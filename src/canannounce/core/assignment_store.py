@@ -0,0 +1,227 @@
+"""
+Incrementally synced local table of each course's future assignments.
+
+get_upcoming_assignments used to download every future assignment and
+re-parse every due date for each window it was asked about. The store
+keeps, per course, a table of assignments (id -> fields the app uses)
+with a due-date index sorted for bisect, so "due in the next N days" is
+answered locally with a range query and changing UPCOMING_ASSIGNMENT_DAYS
+needs no Canvas request.
+
+Canvas has no updated_since filter for the assignment list, so a sync
+still walks the list; the Canvas client revalidates the pages with their
+ETags (unchanged pages cost a 304), and only assignments whose updated_at
+differs from the stored copy are re-parsed. Assignments without an
+updated_at, such as those stored from the GraphQL course query, are always
+re-parsed. Tables are persisted in the disk cache and a stale table is
+answered immediately and synced in the background.
+"""
+import bisect
+import datetime
+import threading
+import time
+
+from .disk_cache import get_disk_cache, ASSIGNMENTS_MAX_AGE
+
+# Bumped when the stored table layout changes, so older tables are rebuilt
+TABLE_FORMAT = 1
+
+# Assignment fields kept in the table
+ASSIGNMENT_FIELDS = ('id', 'name', 'due_at', 'html_url', 'points_possible', 'updated_at')
+
+_assignment_store = None
+_assignment_store_lock = threading.Lock()
+
+
+def _due_timestamp(assignment):
+    try:
+        return datetime.datetime.fromisoformat(assignment['due_at'].replace('Z', '+00:00')).timestamp()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class AssignmentTable:
+    """
+    One course's assignments with a due-date index.
+
+    Args:
+        assignments (list, optional): Stored assignments to start from.
+        synced_at (float, optional): Time of the last successful sync.
+    """
+
+    def __init__(self, assignments=None, synced_at=0.0):
+        self.assignments = {assignment['id']: assignment for assignment in assignments or []}
+        self.synced_at = synced_at
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        # Due dates are parsed once, when an assignment enters the table
+        index = sorted((assignment['due_ts'], assignment_id)
+                       for assignment_id, assignment in self.assignments.items()
+                       if assignment.get('due_ts') is not None)
+        self.due_keys = [timestamp for timestamp, _ in index]
+        self.due_ids = [assignment_id for _, assignment_id in index]
+
+    def merge(self, fetched):
+        """
+        Apply a fresh assignment list from Canvas.
+
+        Returns:
+            int: Number of assignments added, changed or removed
+        """
+        changed = 0
+        seen = set()
+        for assignment in fetched:
+            assignment_id = assignment.get('id')
+            if assignment_id is None:
+                continue
+            seen.add(assignment_id)
+            stored = self.assignments.get(assignment_id)
+            # Unchanged assignments keep their stored copy and index entry
+            if stored is not None and stored.get('updated_at') == assignment.get('updated_at') \
+                    and assignment.get('updated_at') is not None:
+                continue
+            stored = {field: assignment.get(field) for field in ASSIGNMENT_FIELDS}
+            stored['due_ts'] = _due_timestamp(stored)
+            self.assignments[assignment_id] = stored
+            changed += 1
+
+        # Assignments no longer listed were deleted, unpublished or are now past due
+        for assignment_id in set(self.assignments) - seen:
+            del self.assignments[assignment_id]
+            changed += 1
+
+        if changed:
+            self._rebuild_index()
+        self.synced_at = time.time()
+        return changed
+
+    def due_between(self, start, end):
+        """Return the assignments due between two datetimes, sorted by due date."""
+        low = bisect.bisect_left(self.due_keys, start.timestamp())
+        high = bisect.bisect_right(self.due_keys, end.timestamp())
+        assignments = []
+        for assignment_id in self.due_ids[low:high]:
+            assignment = dict(self.assignments[assignment_id])
+            del assignment['due_ts']
+            assignments.append(assignment)
+        return assignments
+
+    def to_dict(self):
+        return {
+            'format': TABLE_FORMAT,
+            'assignments': list(self.assignments.values()),
+            'synced_at': self.synced_at
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict) or data.get('format') != TABLE_FORMAT:
+            return None
+        return cls(data.get('assignments'), data.get('synced_at', 0.0))
+
+
+class AssignmentStore:
+    """
+    In-memory assignment tables backed by the disk cache.
+
+    Args:
+        max_age (float): Seconds after which a table is synced again.
+    """
+
+    def __init__(self, max_age=ASSIGNMENTS_MAX_AGE):
+        self.max_age = max_age
+        self._tables = {}
+        self._syncing = set()
+        self._lock = threading.Lock()
+
+    def _get_table(self, key):
+        with self._lock:
+            table = self._tables.get(key)
+        if table is None:
+            cached = get_disk_cache().get(key)
+            table = AssignmentTable.from_dict(cached[0]) if cached is not None else None
+            if table is not None:
+                with self._lock:
+                    table = self._tables.setdefault(key, table)
+        return table
+
+    def sync(self, key, fetch):
+        """
+        Fetch the course's future assignments and merge them into its table.
+
+        Args:
+            key (str): Cache key of the course's table, see cache_key().
+            fetch (callable): Zero-argument function returning the assignment
+                list from Canvas, or None if the request failed.
+
+        Returns:
+            AssignmentTable: The updated table, or None if the fetch failed
+                and nothing was stored before.
+        """
+        fetched = fetch()
+        table = self._get_table(key)
+        if fetched is None:
+            return table
+
+        with self._lock:
+            table = self._tables.setdefault(key, table or AssignmentTable())
+            changed = table.merge(fetched)
+            data = table.to_dict()
+        print(f"Synced assignments: {changed} changed of {len(fetched)}")
+        # The table is written back even when unchanged, to record synced_at
+        get_disk_cache().set(key, data)
+        return table
+
+    def _sync_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._syncing:
+                return
+            self._syncing.add(key)
+
+        def run():
+            try:
+                self.sync(key, fetch)
+            except Exception as e:
+                print(f"Error syncing assignments for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._syncing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def due_between(self, key, fetch, start, end):
+        """
+        Return the course's assignments due between start and end.
+
+        The range query runs on the local table. A course seen for the first
+        time is synced before answering; a stale table answers immediately
+        and is synced in the background.
+
+        Returns:
+            list: Assignments sorted by due date, or None if the course could
+                not be loaded
+        """
+        table = self._get_table(key)
+        if table is None:
+            table = self.sync(key, fetch)
+            if table is None:
+                return None
+        elif time.time() - table.synced_at > self.max_age:
+            self._sync_in_background(key, fetch)
+
+        with self._lock:
+            return table.due_between(start, end)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+
+def get_assignment_store():
+    """Return the shared AssignmentStore."""
+    global _assignment_store
+    with _assignment_store_lock:
+        if _assignment_store is None:
+            _assignment_store = AssignmentStore()
+        return _assignment_store
@@ -0,0 +1,66 @@
+"""
+Async counterparts of the Canvas course fetchers in course_utils.
+
+Each coroutine has the same signature as its blocking counterpart and runs
+it on a bounded thread pool, so callers can gather several Canvas calls
+concurrently while still sharing the pooled client, pagination engine and
+response cache.
+"""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import course_utils
+
+# Maximum number of blocking Canvas calls running at once for async callers
+ASYNC_MAX_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix='canvas-async')
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function on the shared Canvas worker pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_with_timeout(awaitable, timeout, default=None):
+    """
+    Await a Canvas call with a timeout, returning a default instead of raising.
+
+    The worker thread behind a timed-out call keeps running and still fills
+    the caches; only the caller stops waiting for it.
+
+    Returns:
+        tuple: (result or default, elapsed milliseconds, error message or None)
+    """
+    start = time.perf_counter()
+    try:
+        result, error = await asyncio.wait_for(awaitable, timeout), None
+    except asyncio.TimeoutError:
+        result, error = default, f"timed out after {timeout}s"
+    except Exception as e:
+        result, error = default, str(e)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    return result, elapsed_ms, error
+
+
+async def get_course_details(token, base_url, course_id):
+    """Async version of course_utils.get_course_details."""
+    return await run_blocking(course_utils.get_course_details, token, base_url, course_id)
+
+
+async def get_course_people(token, base_url, course_id):
+    """Async version of course_utils.get_course_people."""
+    return await run_blocking(course_utils.get_course_people, token, base_url, course_id)
+
+
+async def get_canvas_courses(token, base_url, filter_term=None):
+    """Async version of course_utils.get_canvas_courses."""
+    return await run_blocking(course_utils.get_canvas_courses, token, base_url, filter_term=filter_term)
+
+
+async def get_upcoming_assignments(token, base_url, course_id, days=None):
+    """Async version of course_utils.get_upcoming_assignments."""
+    return await run_blocking(course_utils.get_upcoming_assignments, token, base_url, course_id, days=days)
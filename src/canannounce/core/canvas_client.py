@@ -0,0 +1,192 @@
+"""
+Shared HTTP client for talking to the Canvas API.
+
+Every Canvas fetcher routes through a CanvasClient so that requests to the
+same Canvas host reuse warm keep-alive connections instead of paying a new
+TCP+TLS handshake per call. GET responses are kept in a ResponseCache so
+data that rarely changes within a class session is not refetched. Requests
+to Canvas pass through the client's RateLimiter so concurrent fetchers back
+off before Canvas starts rejecting them.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
+
+# Number of pooled connections kept open per Canvas host
+DEFAULT_POOL_SIZE = 10
+# Seconds to wait for Canvas to connect and respond before giving up
+DEFAULT_TIMEOUT = 30
+# Seconds a storage host may take to answer once an uploaded file has been
+# sent, plus an allowance per MB since large files are processed before it replies
+UPLOAD_READ_TIMEOUT = 300
+UPLOAD_READ_SECONDS_PER_MB = 0.5
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class CanvasClient:
+    """
+    Connection-pooled Canvas API client bound to one base URL and token.
+
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        pool_size (int): Maximum number of pooled connections per host.
+        cache (ResponseCache, optional): Cache for GET responses. Pass False
+            to disable caching for this client.
+    """
+
+    def __init__(self, token, base_url, pool_size=DEFAULT_POOL_SIZE, cache=None):
+        self.token = token
+        self.base_url = (base_url or '').rstrip('/')
+        self.pool_size = pool_size
+        self.cache = ResponseCache() if cache is None else (cache or None)
+        self.rate_limiter = RateLimiter()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Default headers are built once and sent with every Canvas request
+        self.session.headers.update({
+            'Authorization': f'Bearer {token}',
+            'Accept': 'application/json'
+        })
+
+    def url_for(self, path):
+        """Return an absolute URL for an API path, leaving absolute URLs untouched."""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, authenticate=True, **kwargs):
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method (str): HTTP method.
+            path (str): API path (e.g. '/api/v1/courses') or absolute URL.
+            authenticate (bool): Set to False for non-Canvas hosts such as the
+                file storage upload URL, so the API token is not leaked to them.
+            **kwargs: Passed through to requests.Session.request. Without a
+                timeout, DEFAULT_TIMEOUT applies; file uploads should pass
+                upload_timeout().
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        if not authenticate:
+            # A None value removes the session-level header for this request only
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers['Authorization'] = None
+            kwargs['headers'] = headers
+            # Storage hosts are not subject to the Canvas rate limit
+            return self.session.request(method, self.url_for(path), **kwargs)
+
+        response = None
+        self.rate_limiter.acquire()
+        try:
+            response = self.session.request(method, self.url_for(path), **kwargs)
+            return response
+        finally:
+            self.rate_limiter.release(response)
+
+    def get(self, path, params=None, **kwargs):
+        """
+        Send a GET request, answering from the response cache when possible.
+
+        Fresh cache entries are returned without a network call. Stale entries
+        are revalidated with If-None-Match/If-Modified-Since and reused on 304.
+        """
+        if self.cache is None or not kwargs.get('authenticate', True):
+            return self.request('GET', path, params=params, **kwargs)
+
+        prepared = PreparedRequest()
+        prepared.prepare_url(self.url_for(path), params)
+        key = prepared.url
+
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh():
+            self.cache.record('hit')
+            return entry.response
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.cache.conditional_headers(entry))
+        response = self.request('GET', key, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.record('revalidated')
+            return self.cache.refresh(key, entry, response)
+
+        self.cache.record('miss')
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def upload_timeout(size):
+    """
+    Return the (connect, read) timeout for sending a file of size bytes to a
+    storage host, so a slow reply after a large upload is not mistaken for a
+    dropped connection.
+    """
+    return DEFAULT_TIMEOUT, UPLOAD_READ_TIMEOUT + UPLOAD_READ_SECONDS_PER_MB * size / (1024 * 1024)
+
+
+def get_canvas_client(token, base_url, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Return the shared CanvasClient for a base URL and token, creating it on first use.
+
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        pool_size (int): Maximum number of pooled connections per host. Only
+            used when the client is first created.
+
+    Returns:
+        CanvasClient: The shared client instance.
+    """
+    key = ((base_url or '').rstrip('/'), token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = CanvasClient(token, base_url, pool_size=pool_size)
+            _clients[key] = client
+        return client
+
+
+def get_cache_stats():
+    """Return response cache counters for every shared client, keyed by base URL."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.base_url: client.cache.stats() for client in clients if client.cache is not None}
+
+
+def get_rate_limit_stats():
+    """Return rate limit bucket estimates and throttling counters for every shared client."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.base_url: client.rate_limiter.stats() for client in clients}
+
+
+def clear_response_caches():
+    """Drop all cached Canvas responses, e.g. after settings change."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    for client in clients:
+        if client.cache is not None:
+            client.cache.clear()
@@ -0,0 +1,69 @@
+"""
+Course picker data: the current courses and their upcoming assignments.
+
+Two interchangeable data paths are available, selected with the DATA_SOURCE
+setting: 'rest' (one course list request plus one assignments request per
+course) and 'graphql' (a single /api/graphql query, see graphql_utils). The
+GraphQL path falls back to REST if the query fails, e.g. on Canvas instances
+where the schema differs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from ..config import DATA_SOURCE, UPCOMING_ASSIGNMENT_DAYS
+from ..config.settings_manager import settings_manager
+from .course_utils import get_canvas_courses, get_upcoming_assignments
+from .graphql_utils import GraphQLError, get_courses_with_assignments_graphql
+
+DATA_SOURCES = ('rest', 'graphql')
+
+# Number of per-course assignment requests run at once on the REST path
+REST_MAX_WORKERS = 4
+
+
+def get_data_source():
+    """Return the configured data source, 'rest' or 'graphql'."""
+    data_source = str(settings_manager.get_setting('DATA_SOURCE', DATA_SOURCE) or '').lower()
+    return data_source if data_source in DATA_SOURCES else 'rest'
+
+
+def get_courses_with_assignments(token, base_url, days=None, data_source=None):
+    """
+    Fetch the current courses and the upcoming assignments of each.
+
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        days (int, optional): Number of days into the future to look for
+            assignments. Defaults to UPCOMING_ASSIGNMENT_DAYS.
+        data_source (str, optional): 'rest' or 'graphql'. Defaults to the
+            DATA_SOURCE setting.
+
+    Returns:
+        tuple: (courses, assignments) where courses matches get_canvas_courses
+            and assignments maps course ID to the get_upcoming_assignments list.
+    """
+    if days is None:
+        days = UPCOMING_ASSIGNMENT_DAYS
+    data_source = data_source or get_data_source()
+
+    courses, assignments = None, {}
+    if data_source == 'graphql':
+        try:
+            courses, assignments = get_courses_with_assignments_graphql(token, base_url, days)
+        except (GraphQLError, requests.RequestException, ValueError, KeyError) as e:
+            print(f"GraphQL course data failed ({e}), falling back to REST")
+
+    if courses is None:
+        courses = get_canvas_courses(token, base_url)
+
+    # Courses the GraphQL query could not cover completely are fetched over REST
+    missing = [course['id'] for course in courses if course['id'] not in assignments]
+    if missing:
+        with ThreadPoolExecutor(max_workers=REST_MAX_WORKERS) as executor:
+            results = executor.map(lambda course_id: get_upcoming_assignments(token, base_url, course_id, days=days),
+                                   missing)
+            assignments.update(zip(missing, results))
+
+    return courses, assignments
@@ -1,11 +1,18 @@
 """
 Utilities for interacting with Canvas courses and assignments.
 """
-import requests
 import datetime
+import functools
+import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timezone, timedelta
 from ..config import UPCOMING_ASSIGNMENT_DAYS
+from .assignment_store import get_assignment_store
+from .canvas_client import get_canvas_client
+from .disk_cache import cache_key
+from .pagination import fetch_all_pages, PaginationError
+from .term_index import get_term_index
 
 
 def get_course_details(token, base_url, course_id):
@@ -18,11 +25,9 @@ def get_course_details(token, base_url, course_id):
     Returns:
         dict: Course details if successful, None otherwise.
     """
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
-    url = f"{base_url}/api/v1/courses/{course_id}"
-    response = requests.get(url, headers=headers)
+    client = get_canvas_client(token, base_url)
+    url = f"/api/v1/courses/{course_id}"
+    response = client.get(url)
     if response.status_code == 200:
         return response.json()
     else:
@@ -41,32 +46,35 @@ def get_course_people(token, base_url, course_id):
     Returns:
         list: List of people if successful, None otherwise.
     """
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
-    url = f"{base_url}/api/v1/courses/{course_id}/users"
+    client = get_canvas_client(token, base_url)
+    url = f"/api/v1/courses/{course_id}/users"
     params = {
         'include[]': ['enrollments'],
         'per_page': 100
     }
-    people = []
-    while url:
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            batch = response.json()
-            people.extend(batch)
-            # Check for pagination Link header
-            links = response.links if hasattr(response, 'links') else {}
-            url = links.get('next', {}).get('url')
-        else:
-            print(f"Failed to fetch course people. Status code: {response.status_code}")
-            return None
-    return people
+    try:
+        # Remaining pages are fetched concurrently once the page count is known
+        return fetch_all_pages(client, url, params=params)
+    except PaginationError as e:
+        print(f"Failed to fetch course people. Status code: {e.status_code}")
+        return None
+
+
+# Enrollment types that make a course show up in the course picker
+TEACHING_ENROLLMENT_TYPES = ('teacher', 'ta', 'designer')
+
+# Course states worth listing; concluded ('completed') and deleted courses are dropped by Canvas
+COURSE_STATES = ['available', 'unpublished']
+
+# Section-style course codes that, together with the current year, mark a current course
+SECTION_CODES = ('-01', '-02', '-03', '-1', '-2', '-3', '-section')
 
 
 def get_canvas_courses(token, base_url, filter_term=None):
     """
     Fetch a list of active Canvas courses for the authenticated user.
+    Canvas filters by enrollment type and course state server-side, so
+    concluded courses from past years never cross the wire.
     Args:
         token (str): Canvas API access token.
         base_url (str): Base URL of the Canvas instance.
@@ -74,117 +82,159 @@ def get_canvas_courses(token, base_url, filter_term=None):
     Returns:
         list: List of active courses where the user is a teacher in the current semester.
     """
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
-    url = f"{base_url}/api/v1/courses"
-    params = {
-        'enrollment_state': 'active',
-        'include[]': ['term', 'enrollments'],  # Include term and enrollment information
-        'per_page': 100
-    }
-
-    # Get current date to determine current semester
-    current_date = datetime.datetime.now()
-    current_year = current_date.year
-    current_month = current_date.month
+    client = get_canvas_client(token, base_url)
+    url = "/api/v1/courses"
+
+    def fetch(enrollment_type):
+        params = {
+            'enrollment_type': enrollment_type,
+            'enrollment_state': 'active',
+            'state[]': COURSE_STATES,
+            'include[]': ['term', 'enrollments'],  # Include term and enrollment information
+            'per_page': 100
+        }
+        return fetch_all_pages(client, url, params=params)
+
+    # Canvas takes one enrollment type per request, so the teaching roles are fetched concurrently
+    try:
+        with ThreadPoolExecutor(max_workers=len(TEACHING_ENROLLMENT_TYPES)) as executor:
+            batches = list(executor.map(fetch, TEACHING_ENROLLMENT_TYPES))
+    except PaginationError as e:
+        print(f"Failed to fetch courses. Status code: {e.status_code}")
+        return []
+
+    # A course appears once per teaching role the user holds in it
+    courses = {}
+    for batch in batches:
+        for course in batch:
+            courses.setdefault(course.get('id'), course)
+
+    return filter_current_courses(list(courses.values()))
+
+
+def get_current_semester(today=None):
+    """
+    Return the (semester, year) a date falls in, guessed from the month.
+    Only used for courses whose term has no dates (see term_index).
+    Args:
+        today (date, optional): Date to resolve. Defaults to today.
+    Returns:
+        tuple: ('Spring', 'Summer' or 'Fall', year)
+    """
+    today = today or datetime.date.today()
 
     # Determine current semester based on month
-    if 1 <= current_month <= 5:
-        current_semester = "Spring"
-    elif 6 <= current_month <= 7:
-        current_semester = "Summer"
+    if 1 <= today.month <= 5:
+        return "Spring", today.year
+    elif 6 <= today.month <= 7:
+        return "Summer", today.year
     else:  # 8-12
-        current_semester = "Fall"
+        return "Fall", today.year
+
 
-    # Format strings to look for in course/term names
-    current_year_str = str(current_year)
-    semester_patterns = [
+@functools.lru_cache(maxsize=4)
+def get_semester_patterns(semester, year):
+    """Return the strings that identify a semester in course and term names."""
+    short = semester[:2].upper()
+    year_2 = str(year)[2:]
+    return (
         # Full semester names
-        f"{current_semester} {current_year}",
-        f"{current_semester}{current_year}",
+        f"{semester} {year}",
+        f"{semester}{year}",
         # Abbreviations (SP, SU, FA)
-        f"{current_semester[:2].upper()}{current_year}",
-        f"{current_semester[:2].upper()}-{current_year}",
-        f"{current_semester[:2].upper()} {current_year}",
+        f"{short}{year}",
+        f"{short}-{year}",
+        f"{short} {year}",
         # Year-semester format
-        f"{current_year}{current_semester[:2].upper()}",
-        f"{current_year}-{current_semester[:2].upper()}",
-        f"{current_year} {current_semester[:2].upper()}",
+        f"{year}{short}",
+        f"{year}-{short}",
+        f"{year} {short}",
         # 2-digit year formats
-        f"{current_semester} {str(current_year)[2:]}",
-        f"{current_semester}{str(current_year)[2:]}",
-        f"{current_semester[:2].upper()}{str(current_year)[2:]}",
-        f"{str(current_year)[2:]}{current_semester[:2].upper()}",
+        f"{semester} {year_2}",
+        f"{semester}{year_2}",
+        f"{short}{year_2}",
+        f"{year_2}{short}",
         # Code format (like 2025FS for Fall 2025)
-        f"{current_year}{current_semester[:2]}",
-    ]
+        f"{year}{semester[:2]}",
+    )
 
-    print(f"Filtering for courses matching patterns: {semester_patterns}")
 
+@functools.lru_cache(maxsize=4)
+def _compile_semester_matcher(semester, year):
+    patterns = get_semester_patterns(semester, year)
+    return re.compile('|'.join(re.escape(pattern) for pattern in patterns), re.IGNORECASE)
+
+
+def get_semester_matcher(today=None):
+    """
+    Return one compiled, case-insensitive regex matching any of the current
+    semester's name patterns. Built once per semester and shared by every
+    course filter, instead of scanning the patterns one by one per course.
+    """
+    return _compile_semester_matcher(*get_current_semester(today))
+
+
+def is_teaching_course(course):
+    """Return True if the user has an active teaching enrollment in the course."""
+    return any(enrollment.get('type') in TEACHING_ENROLLMENT_TYPES and enrollment.get('enrollment_state') == 'active'
+               for enrollment in course.get('enrollments') or [])
+
+
+def filter_current_courses(courses):
+    """
+    Keep the courses the user teaches in the current semester.
+    Shared by the REST and GraphQL course fetchers.
+    Args:
+        courses (list): Courses in Canvas REST format, with 'term' and 'enrollments'.
+    Returns:
+        list: Matching courses with a 'display_name', sorted by name.
+    """
+    semester, year = get_current_semester()
+    matcher = get_semester_matcher()
+    current_year_str = str(year)
+
+    # Filter out courses without a name or ID
+    valid_courses = [c for c in courses if c.get('name') and c.get('id')]
+
+    # Courses whose term has dates are selected by date; the rest by name patterns
+    term_index = get_term_index()
+    term_index.update(valid_courses)
+    print(f"Current terms by date: {sorted(term_index.current_term_ids(), key=str)}; "
+          f"other courses matched against patterns: {list(get_semester_patterns(semester, year))}")
+
+    # Filter for courses where the user is a teacher and in current semester
     courses = []
-    while url:
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            batch = response.json()
-            # Filter out courses without a name or ID
-            valid_courses = [c for c in batch if c.get('name') and c.get('id')]
-
-            # Filter for courses where the user is a teacher and in current semester
-            filtered_courses = []
-            for course in valid_courses:
-                # Check if the user has a teacher enrollment in this course
-                is_teacher = False
-                if 'enrollments' in course:
-                    for enrollment in course['enrollments']:
-                        if enrollment.get('type') in ['teacher', 'ta', 'designer'] and enrollment.get('enrollment_state') == 'active':
-                            is_teacher = True
-                            break
-
-                if not is_teacher:
-                    continue
-
-                # Skip courses with "sandbox" in the name (case insensitive)
-                course_name = course.get('name', '').lower()
-                if 'sandbox' in course_name:
-                    continue
-
-                # Check if course is in current semester
-                is_current_semester = False
-                term_name = course.get('term', {}).get('name', '')
-
-                # Look for semester pattern matches in course name or term name
-                for pattern in semester_patterns:
-                    pattern_lower = pattern.lower()
-                    if (pattern_lower in course_name.lower() or
-                        (term_name and pattern_lower in term_name.lower())):
-                        is_current_semester = True
-                        break
-
-                # If no direct semester pattern match, try matching current year with certain course codes
-                if not is_current_semester and current_year_str in course_name:
-                    # Check for course codes that typically include semester indicators like JOUR-4734-01
-                    if any(code in course_name for code in ['-01', '-02', '-03', '-1', '-2', '-3', '-section']):
-                        is_current_semester = True
-
-                if not is_current_semester:
-                    continue
-
-                # Format course name for better display
-                if term_name and term_name.lower() not in course_name.lower():
-                    course['display_name'] = f"{course['name']} ({term_name})"
-                else:
-                    course['display_name'] = course['name']
-
-                filtered_courses.append(course)
-
-            courses.extend(filtered_courses)
-            # Check for pagination Link header
-            links = response.links if hasattr(response, 'links') else {}
-            url = links.get('next', {}).get('url')
+    for course in valid_courses:
+        if not is_teaching_course(course):
+            continue
+
+        # Skip courses with "sandbox" in the name (case insensitive)
+        course_name = course.get('name', '')
+        if 'sandbox' in course_name.lower():
+            continue
+
+        term_name = (course.get('term') or {}).get('name') or ''
+        is_current_semester = term_index.is_current(course.get('term'))
+
+        if is_current_semester is None:
+            # Look for semester pattern matches in course name or term name
+            is_current_semester = bool(matcher.search(course_name) or matcher.search(term_name))
+
+            # If no direct semester pattern match, try matching current year with certain course codes
+            # (course codes that typically include semester indicators like JOUR-4734-01)
+            if not is_current_semester and current_year_str in course_name:
+                is_current_semester = any(code in course_name for code in SECTION_CODES)
+
+        if not is_current_semester:
+            continue
+
+        # Format course name for better display
+        if term_name and term_name.lower() not in course_name.lower():
+            course['display_name'] = f"{course['name']} ({term_name})"
         else:
-            print(f"Failed to fetch courses. Status code: {response.status_code}")
-            return []
+            course['display_name'] = course['name']
+
+        courses.append(course)
 
     # Sort courses by name
     courses.sort(key=lambda c: c.get('name', ''))
@@ -195,6 +245,7 @@ def get_canvas_courses(token, base_url, filter_term=None):
 def get_upcoming_assignments(token, base_url, course_id, days=None):
     """
     Fetch upcoming assignments for a Canvas course.
+    This is the single assignment-window engine used by the web app and the CLI.
     Args:
         token (str): Canvas API access token.
         base_url (str): Base URL of the Canvas instance.
@@ -208,11 +259,78 @@ def get_upcoming_assignments(token, base_url, course_id, days=None):
     if days is None:
         days = UPCOMING_ASSIGNMENT_DAYS
 
-    headers = {
-        'Authorization': f'Bearer {token}'
+    # Due dates are looked up in the course's incrementally synced assignment
+    # table, so only the first call for a course waits for Canvas
+    now = datetime.datetime.now(timezone.utc)
+    batch = get_assignment_store().due_between(
+        _assignment_table_key(token, base_url, course_id),
+        lambda: fetch_future_assignments(token, base_url, course_id),
+        now,
+        now + timedelta(days=days)
+    )
+    if batch is None:
+        return []
+
+    return select_upcoming_assignments(batch, days)
+
+
+def _assignment_table_key(token, base_url, course_id):
+    return cache_key(token, base_url, 'assignment_table', course_id)
+
+
+def store_future_assignments(token, base_url, course_id, assignments):
+    """
+    Write assignments loaded by another data path, such as the GraphQL course
+    query, through the course's assignment table as if it had just been synced.
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        course_id (int or str): The Canvas course ID.
+        assignments (list): Every assignment of the course that is not yet past due,
+                            in Canvas REST format.
+    """
+    get_assignment_store().sync(_assignment_table_key(token, base_url, course_id), lambda: assignments)
+
+
+def fetch_future_assignments(token, base_url, course_id):
+    """
+    Fetch every assignment of a course that is not yet past due.
+
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        course_id (int or str): The Canvas course ID.
+    Returns:
+        list: Assignments ordered by due date, or None if the request failed.
+    """
+    client = get_canvas_client(token, base_url)
+    url = f"/api/v1/courses/{course_id}/assignments"
+
+    # Let Canvas drop past assignments server-side. The 'upcoming' bucket only
+    # covers the next week, so 'future' is used and the window applied afterwards.
+    params = {
+        'per_page': 100,
+        'bucket': 'future',
+        'order_by': 'due_at'
     }
-    url = f"{base_url}/api/v1/courses/{course_id}/assignments"
 
+    try:
+        return fetch_all_pages(client, url, params=params)
+    except PaginationError as e:
+        print(f"Failed to fetch assignments. Status code: {e.status_code}")
+        return None
+
+
+def select_upcoming_assignments(batch, days):
+    """
+    Keep assignments due within the next `days` days and format their due dates.
+    Shared by the REST and GraphQL assignment fetchers.
+    Args:
+        batch (list): Assignments in Canvas REST format (with 'due_at').
+        days (int): Number of days into the future to look for assignments.
+    Returns:
+        list: Upcoming assignments with 'due_at_formatted', sorted by due date.
+    """
     # Get current time and time in the future
     now = datetime.datetime.now(timezone.utc)
     future = now + timedelta(days=days)
@@ -221,43 +339,30 @@ def get_upcoming_assignments(token, base_url, course_id, days=None):
     print(f"Looking for assignments between {now} and {future} ({days} days ahead)")
 
     assignments = []
-    params = {'per_page': 100}
-
-    while url:
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            batch = response.json()
-            for assignment in batch:
-                # Only include assignments with due dates in the future
-                if assignment.get('due_at'):
-                    try:
-                        due_date = datetime.datetime.fromisoformat(assignment['due_at'].replace('Z', '+00:00'))
-
-                        # Debug: print the raw due date and formatted date
-                        print(f"DEBUG: Assignment '{assignment.get('name')}' raw due_at: {assignment.get('due_at')}")
-                        print(f"DEBUG: Parsed due_date UTC: {due_date}")
-
-                        # Convert to Central Time for display (CDT/CST)
-                        central_tz = timezone(timedelta(hours=-5))  # CDT (adjust to -6 for CST if needed)
-                        due_date_local = due_date.astimezone(central_tz)
-
-                        print(f"DEBUG: Due date in Central Time: {due_date_local}")
-                        print(f"DEBUG: Formatted date: {due_date_local.strftime('%a %b %d')}")
-
-                        if now <= due_date <= future:
-                            # Use the local time for formatting display
-                            assignment['due_at_formatted'] = due_date_local.strftime('%a %b %d')
-                            assignments.append(assignment)
-                    except (ValueError, TypeError) as e:
-                        print(f"Error parsing due date for assignment {assignment.get('name')}: {e}")
-                # Assignments with no due dates are now excluded
-
-            # Check for pagination
-            links = response.links if hasattr(response, 'links') else {}
-            url = links.get('next', {}).get('url')
-        else:
-            print(f"Failed to fetch assignments. Status code: {response.status_code}")
-            return []
+    for assignment in batch:
+        # Only include assignments with due dates in the future
+        if assignment.get('due_at'):
+            try:
+                due_date = datetime.datetime.fromisoformat(assignment['due_at'].replace('Z', '+00:00'))
+
+                # Debug: print the raw due date and formatted date
+                print(f"DEBUG: Assignment '{assignment.get('name')}' raw due_at: {assignment.get('due_at')}")
+                print(f"DEBUG: Parsed due_date UTC: {due_date}")
+
+                # Convert to Central Time for display (CDT/CST)
+                central_tz = timezone(timedelta(hours=-5))  # CDT (adjust to -6 for CST if needed)
+                due_date_local = due_date.astimezone(central_tz)
+
+                print(f"DEBUG: Due date in Central Time: {due_date_local}")
+                print(f"DEBUG: Formatted date: {due_date_local.strftime('%a %b %d')}")
+
+                if now <= due_date <= future:
+                    # Use the local time for formatting display
+                    assignment['due_at_formatted'] = due_date_local.strftime('%a %b %d')
+                    assignments.append(assignment)
+            except (ValueError, TypeError) as e:
+                print(f"Error parsing due date for assignment {assignment.get('name')}: {e}")
+        # Assignments with no due dates are now excluded
 
     # Sort assignments by due date
     assignments.sort(key=lambda x: x['due_at'])
@@ -0,0 +1,143 @@
+"""
+Persistent on-disk cache of Canvas data for instant cold starts.
+
+Values are stored as JSON in a SQLite database in the user config directory.
+get_or_refresh() implements stale-while-revalidate: a cached value is
+returned immediately and, if it is older than max_age, refreshed from Canvas
+on a background thread so the next page load sees current data.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from ..config.settings_manager import get_user_config_dir
+
+CACHE_FILENAME = 'canvas_cache.sqlite3'
+
+# Seconds before a cached value is refreshed in the background
+COURSES_MAX_AGE = 60
+ASSIGNMENTS_MAX_AGE = 60
+QUIZZES_MAX_AGE = 300
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def cache_key(token, base_url, *parts):
+    """
+    Build a cache key scoped to a Canvas instance and token.
+    Only a short hash of the token is stored, never the token itself.
+    """
+    token_hash = hashlib.sha256((token or '').encode('utf-8')).hexdigest()[:12]
+    return ':'.join([(base_url or '').rstrip('/'), token_hash] + [str(part) for part in parts])
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value cache of JSON-serializable Canvas data.
+
+    Args:
+        path (str or Path, optional): Database file. Defaults to
+            canvas_cache.sqlite3 in the user config directory.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            config_dir = get_user_config_dir()
+            config_dir.mkdir(parents=True, exist_ok=True)
+            path = config_dir / CACHE_FILENAME
+
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)'
+            )
+
+    def get(self, key):
+        """Return (value, stored_at) for key, or None if not cached."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, stored_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key."""
+        data = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, stored_at) VALUES (?, ?, ?)',
+                (key, data, time.time())
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries')
+
+    def get_or_refresh(self, key, fetch, max_age):
+        """
+        Return the cached value for key, refreshing it in the background if stale.
+
+        Args:
+            key (str): Cache key, see cache_key().
+            fetch (callable): Zero-argument function that loads the value from
+                Canvas. A None result is treated as a failure and not cached.
+            max_age (float): Age in seconds after which the value is refreshed.
+
+        Returns:
+            The cached value, or the freshly fetched value on a cold cache.
+        """
+        cached = self.get(key)
+        if cached is None:
+            value = fetch()
+            if value is not None:
+                self.set(key, value)
+            return value
+
+        value, stored_at = cached
+        if time.time() - stored_at > max_age:
+            self._refresh_in_background(key, fetch)
+        return value
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if value is not None:
+                    self.set(key, value)
+            except Exception as e:
+                print(f"Error refreshing cached data for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_disk_cache():
+    """Return the shared DiskCache, opening the database on first use."""
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = DiskCache()
+        return _disk_cache
@@ -0,0 +1,165 @@
+"""
+Canvas GraphQL data path for the course picker.
+
+The REST path needs one request for the course list and then one per course
+for upcoming assignments. /api/graphql returns the user's current
+enrollments together with each course's term and assignments in a single
+query, so loading the picker data takes two round trips (the first, the
+user id lookup, is usually answered from the response cache) however many
+courses the instructor teaches. Results are converted to the REST shapes so
+the same course filter and assignment window apply to both paths.
+"""
+import datetime
+from datetime import timezone
+
+from .canvas_client import get_canvas_client
+from .course_utils import filter_current_courses, select_upcoming_assignments, store_future_assignments
+from .retry import send_with_retry
+
+COURSE_DATA_QUERY = """
+query CourseData($userId: ID!) {
+  legacyNode(_id: $userId, type: User) {
+    ... on User {
+      enrollments(currentOnly: true) {
+        type
+        state
+        course {
+          _id
+          name
+          courseCode
+          term { _id name startAt endAt }
+          assignmentsConnection {
+            nodes { _id name dueAt htmlUrl pointsPossible }
+            pageInfo { hasNextPage }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# GraphQL enrollment types and their REST equivalents
+ENROLLMENT_TYPES = {
+    'TeacherEnrollment': 'teacher',
+    'TaEnrollment': 'ta',
+    'DesignerEnrollment': 'designer',
+    'StudentEnrollment': 'student',
+    'ObserverEnrollment': 'observer'
+}
+
+
+class GraphQLError(Exception):
+    """Raised when /api/graphql fails or answers with errors."""
+
+
+def graphql_query(token, base_url, query, variables=None):
+    """
+    Run a query against the Canvas GraphQL endpoint.
+
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        query (str): GraphQL query document.
+        variables (dict, optional): Query variables.
+
+    Returns:
+        dict: The 'data' member of the response.
+
+    Raises:
+        GraphQLError: If the request fails or the response contains errors.
+    """
+    client = get_canvas_client(token, base_url)
+    response = send_with_retry(
+        lambda: client.post('/api/graphql', json={'query': query, 'variables': variables or {}}),
+        description='GraphQL query'
+    )
+    if response.status_code != 200:
+        raise GraphQLError(f"GraphQL request failed with status {response.status_code}")
+
+    payload = response.json()
+    if payload.get('errors'):
+        raise GraphQLError('; '.join(error.get('message', 'unknown error') for error in payload['errors']))
+    return payload.get('data') or {}
+
+
+def _rest_due_at(due_at):
+    # GraphQL returns local offsets; REST uses UTC with a Z suffix, which also sorts correctly as text
+    if not due_at:
+        return None
+    due_date = datetime.datetime.fromisoformat(due_at.replace('Z', '+00:00'))
+    return due_date.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def get_courses_with_assignments_graphql(token, base_url, days):
+    """
+    Fetch the current courses and their upcoming assignments in one GraphQL query.
+
+    Args:
+        token (str): Canvas API access token.
+        base_url (str): Base URL of the Canvas instance.
+        days (int): Number of days into the future to look for assignments.
+
+    Returns:
+        tuple: (courses, assignments) where courses matches get_canvas_courses
+            and assignments maps course ID to the get_upcoming_assignments list.
+            Courses with more assignments than one GraphQL page are left out
+            of assignments so the caller can fetch them over REST. The
+            assignments of the other courses are written through their
+            assignment tables, so later lookups are answered locally.
+
+    Raises:
+        GraphQLError: If the user or the query cannot be loaded.
+    """
+    client = get_canvas_client(token, base_url)
+    user_resp = client.get('/api/v1/users/self')
+    if user_resp.status_code != 200:
+        raise GraphQLError(f"Failed to look up the current user. Status code: {user_resp.status_code}")
+
+    data = graphql_query(token, base_url, COURSE_DATA_QUERY, {'userId': str(user_resp.json()['id'])})
+    enrollments = (data.get('legacyNode') or {}).get('enrollments') or []
+
+    # Convert to the REST course shape, merging several enrollments in one course
+    courses = {}
+    raw_assignments = {}
+    for enrollment in enrollments:
+        node = enrollment.get('course')
+        if not node:
+            continue
+        course_id = int(node['_id'])
+        term = node.get('term') or {}
+        course = courses.setdefault(course_id, {
+            'id': course_id,
+            'name': node.get('name'),
+            'course_code': node.get('courseCode'),
+            'term': {'id': int(term['_id']) if term.get('_id') else None, 'name': term.get('name'),
+                     'start_at': term.get('startAt'), 'end_at': term.get('endAt')},
+            'enrollments': []
+        })
+        course['enrollments'].append({
+            'type': ENROLLMENT_TYPES.get(enrollment.get('type'), enrollment.get('type')),
+            'enrollment_state': enrollment.get('state')
+        })
+
+        connection = node.get('assignmentsConnection') or {}
+        if not (connection.get('pageInfo') or {}).get('hasNextPage'):
+            raw_assignments[course_id] = [{
+                'id': int(assignment['_id']),
+                'name': assignment.get('name'),
+                'due_at': _rest_due_at(assignment.get('dueAt')),
+                'html_url': assignment.get('htmlUrl'),
+                'points_possible': assignment.get('pointsPossible')
+            } for assignment in connection.get('nodes') or []]
+
+    filtered = filter_current_courses(list(courses.values()))
+    now = _rest_due_at(datetime.datetime.now(timezone.utc).isoformat())
+    assignments = {}
+    for course in filtered:
+        if course['id'] not in raw_assignments:
+            continue
+        # Keep what the REST 'future' bucket returns: undated and not yet past due
+        future = [assignment for assignment in raw_assignments[course['id']]
+                  if not assignment['due_at'] or assignment['due_at'] >= now]
+        store_future_assignments(token, base_url, course['id'], future)
+        assignments[course['id']] = select_upcoming_assignments(future, days)
+    return filtered, assignments
@@ -0,0 +1,120 @@
+"""
+Adaptive throttling for the Canvas API rate limit.
+
+Canvas throttles each token with a leaky bucket: every request reserves a
+pre-flight cost while it runs and is charged its actual X-Request-Cost when
+it finishes, and X-Rate-Limit-Remaining reports what is left. When the
+bucket runs dry Canvas answers 403 "Rate Limit Exceeded".
+
+A RateLimiter is shared by all callers of a CanvasClient (one per token in
+the process). It tracks the remaining bucket from response headers, assumes
+the bucket refills at REFILL_RATE between responses, and only lets a new
+request start while the estimated bucket, minus the pre-flight cost of every
+request in flight, stays above LOW_WATER_MARK. With a full bucket requests
+run with full concurrency; as it drains, concurrency shrinks towards one
+request at a time. Until the first response reports the bucket, only one
+request is sent.
+"""
+import threading
+import time
+
+# Size of the Canvas rate limit bucket
+RATE_LIMIT_CAPACITY = 700.0
+# Units Canvas reserves for each request while it is in flight
+PREFLIGHT_COST = 50.0
+# Units per second the bucket is assumed to refill between responses
+REFILL_RATE = 10.0
+# Units kept in reserve so other apps using the same token are not starved
+LOW_WATER_MARK = 100.0
+# Longest a request waits for the bucket before it is sent anyway
+MAX_WAIT = 30.0
+
+
+class RateLimiter:
+    """
+    Token-bucket style gate in front of the Canvas API for one token.
+
+    Call acquire() before sending a request and release(response) when it
+    completes (with None if it raised).
+    """
+
+    def __init__(self):
+        self.remaining = None
+        self.updated_at = None
+        self.in_flight = 0
+        self.last_cost = None
+        self.requests = 0
+        self.responses = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self._condition = threading.Condition()
+
+    def _estimated_remaining(self, now):
+        if self.remaining is None:
+            return RATE_LIMIT_CAPACITY
+        return min(RATE_LIMIT_CAPACITY, self.remaining + REFILL_RATE * (now - self.updated_at))
+
+    def _shortfall(self, now):
+        """Units missing before one more request may start (0 if it may start now)."""
+        if self.responses == 0 and self.in_flight > 0:
+            # Nothing is known about the bucket yet; wait for the first response to report it
+            return PREFLIGHT_COST
+        needed = (self.in_flight + 1) * PREFLIGHT_COST
+        if self.in_flight > 0:
+            needed += LOW_WATER_MARK
+        return max(needed - self._estimated_remaining(now), 0.0)
+
+    def acquire(self):
+        """Block until the rate limit bucket has room for another request."""
+        with self._condition:
+            start = time.monotonic()
+            now = time.time()
+            shortfall = self._shortfall(now)
+            if shortfall > 0:
+                self.throttled += 1
+            while shortfall > 0:
+                waited = time.monotonic() - start
+                if waited >= MAX_WAIT:
+                    break
+                # Woken early when a request in flight finishes and reports the bucket
+                self._condition.wait(min(shortfall / REFILL_RATE, MAX_WAIT - waited))
+                now = time.time()
+                shortfall = self._shortfall(now)
+            self.wait_seconds += time.monotonic() - start
+            self.in_flight += 1
+            self.requests += 1
+
+    def release(self, response=None):
+        """Record the bucket reported by a finished request and wake waiting requests."""
+        with self._condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self.responses += 1
+            if response is not None:
+                self._update(response)
+            self._condition.notify_all()
+
+    def _update(self, response):
+        remaining = response.headers.get('X-Rate-Limit-Remaining')
+        cost = response.headers.get('X-Request-Cost')
+        try:
+            if remaining is not None:
+                self.remaining = float(remaining)
+                self.updated_at = time.time()
+            elif response.status_code == 403 and 'Rate Limit Exceeded' in response.text:
+                self.remaining = 0.0
+                self.updated_at = time.time()
+            if cost is not None:
+                self.last_cost = float(cost)
+        except ValueError:
+            pass
+
+    def stats(self):
+        with self._condition:
+            return {
+                'remaining': round(self._estimated_remaining(time.time()), 1) if self.remaining is not None else None,
+                'in_flight': self.in_flight,
+                'last_cost': self.last_cost,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'wait_seconds': round(self.wait_seconds, 2)
+            }
@@ -0,0 +1,134 @@
+"""
+In-memory response cache for Canvas GET requests.
+
+Entries are kept in LRU order with a per-endpoint time to live. Once an
+entry expires it is revalidated with If-None-Match/If-Modified-Since, so an
+unchanged resource costs a 304 instead of a full JSON body.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+# Time to live in seconds per endpoint, first matching path pattern wins
+DEFAULT_TTLS = [
+    (re.compile(r'/api/v1/courses/?$'), 300),                      # Course list
+    (re.compile(r'/api/v1/courses/\d+/?$'), 600),                  # Course details
+    (re.compile(r'/api/v1/courses/\d+/assignments/?$'), 120),      # Assignments
+    (re.compile(r'/api/v1/courses/\d+/quizzes/\d+/questions/?$'), 600),  # Quiz questions
+    (re.compile(r'/api/v1/courses/\d+/quizzes/?$'), 300),          # Quizzes
+]
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 256
+
+
+class CacheEntry:
+    """A cached response together with its validators and expiry time."""
+
+    def __init__(self, response, ttl):
+        self.response = response
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        self.expires_at = time.monotonic() + ttl
+
+    def is_fresh(self):
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of Canvas GET responses with TTL and revalidation.
+
+    Args:
+        max_entries (int): Maximum number of responses kept before the least
+            recently used entry is evicted.
+        ttls (list, optional): (compiled path pattern, seconds) pairs.
+        default_ttl (int): TTL for paths that match no pattern.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttls=None, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, url):
+        """Return the TTL in seconds for a request URL."""
+        path = urlsplit(url).path
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key):
+        """Return the entry for key (fresh or stale), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def conditional_headers(self, entry):
+        """Build revalidation headers for a stale entry."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key, response):
+        """Cache a 200 response, evicting the least recently used entries if full."""
+        entry = CacheEntry(response, self.ttl_for(response.url or key))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def refresh(self, key, entry, response):
+        """Extend an entry after a 304 Not Modified and return its cached response."""
+        with self._lock:
+            entry.expires_at = time.monotonic() + self.ttl_for(key)
+            entry.etag = response.headers.get('ETag', entry.etag)
+            entry.last_modified = response.headers.get('Last-Modified', entry.last_modified)
+            # Re-insert in case the entry was evicted while the request was in flight
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            return entry.response
+
+    def record(self, outcome):
+        """Count a lookup outcome: 'hit', 'revalidated' or 'miss'."""
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+            elif outcome == 'revalidated':
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters for tuning."""
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0
+            }
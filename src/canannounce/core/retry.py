@@ -0,0 +1,99 @@
+"""
+Retry policy for transient Canvas and file storage errors.
+
+Rate limiting (429, or 403 "Rate Limit Exceeded"), 5xx responses and
+dropped connections are retried with exponential backoff and full jitter,
+so several uploads failing at once do not retry in lock step. A Retry-After
+header from Canvas or the storage host takes precedence over the backoff.
+"""
+import email.utils
+import random
+import time
+
+import requests
+
+# Status codes worth retrying; anything else is returned to the caller as is
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Retries after the first attempt
+MAX_RETRIES = 4
+# Backoff ceiling in seconds for the first retry, doubled for each further retry
+BACKOFF_BASE = 1.0
+# Longest wait between two attempts in seconds
+BACKOFF_MAX = 60.0
+
+# Connection resets, timeouts and bodies cut off mid-transfer
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+# Errors raised before the request was sent, so it cannot have taken effect
+NOT_SENT_ERRORS = (requests.exceptions.ConnectTimeout,)
+
+
+def is_rate_limited(response):
+    """Return True if Canvas rejected the request for the rate limit, without running it."""
+    if response.status_code == 429:
+        return True
+    # Canvas reports an exhausted rate limit bucket as 403
+    return response.status_code == 403 and 'Rate Limit Exceeded' in response.text
+
+
+def is_retryable(response):
+    """Return True if a response reports a transient error."""
+    return response.status_code in RETRY_STATUS_CODES or is_rate_limited(response)
+
+
+def retry_delay(attempt, response=None):
+    """
+    Return the number of seconds to wait before retry number attempt (0-based).
+
+    Honors a Retry-After header (seconds or HTTP date) on the response,
+    otherwise uses exponential backoff with full jitter.
+    """
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(max(seconds, 0.0), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def send_with_retry(send, description='Canvas request', max_retries=MAX_RETRIES):
+    """
+    Call send() until it returns a non-transient response or retries run out.
+
+    Args:
+        send (callable): Sends the request and returns a requests.Response.
+            Request bodies must be re-iterable (e.g. StreamingMultipartBody).
+        description (str): Used in retry log messages.
+        max_retries (int): Retries after the first attempt.
+
+    Returns:
+        requests.Response: The last response received.
+
+    Raises:
+        requests.RequestException: If the last attempt failed to connect.
+    """
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            response = send()
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            reason = str(e)
+        else:
+            if attempt == max_retries or not is_retryable(response):
+                return response
+            reason = f"status {response.status_code}"
+
+        delay = retry_delay(attempt, response)
+        print(f"{description} failed ({reason}), retrying in {delay:.1f}s "
+              f"(attempt {attempt + 2} of {max_retries + 1})")
+        time.sleep(delay)
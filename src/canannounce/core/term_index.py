@@ -0,0 +1,82 @@
+"""
+Index of Canvas enrollment terms and their dates.
+
+Guessing the semester from the month and name patterns misses summer
+sessions, intersessions and terms named differently from the patterns.
+Courses fetched with include[]=term carry their term's start and end dates,
+so the index collects those (term id -> dates) from every course list it
+sees and resolves which terms contain today. The resolved set is cached per
+day and only recomputed when the index learns a new or changed term.
+Terms without dates (such as the catch-all "Default Term") cannot be
+resolved and are left to the name patterns.
+"""
+import datetime
+import threading
+
+_term_index = None
+_term_index_lock = threading.Lock()
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except (ValueError, AttributeError):
+        return None
+
+
+class TermIndex:
+    """Term id -> (start date, end date) for every dated term seen so far."""
+
+    def __init__(self):
+        self.terms = {}
+        self._current = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _term_key(term):
+        return term.get('id') if term.get('id') is not None else term.get('name')
+
+    def update(self, courses):
+        """Add the terms of a list of courses (Canvas REST format with 'term')."""
+        with self._lock:
+            for course in courses:
+                term = course.get('term') or {}
+                start, end = _parse_date(term.get('start_at')), _parse_date(term.get('end_at'))
+                key = self._term_key(term)
+                if key is None or not (start and end):
+                    continue
+                if self.terms.get(key) != (start, end):
+                    self.terms[key] = (start, end)
+                    self._current = None
+
+    def current_term_ids(self, today=None):
+        """Return the ids of the indexed terms whose date window contains today."""
+        today = today or datetime.date.today()
+        with self._lock:
+            if self._current is None or self._current[0] != today:
+                current = frozenset(key for key, (start, end) in self.terms.items() if start <= today <= end)
+                self._current = (today, current)
+            return self._current[1]
+
+    def is_current(self, term, today=None):
+        """
+        Return True or False if the term's dates say whether it is running
+        today, or None if the term has no dates and the caller must decide.
+        """
+        key = self._term_key(term or {})
+        with self._lock:
+            known = key in self.terms
+        if not known:
+            return None
+        return key in self.current_term_ids(today)
+
+
+def get_term_index():
+    """Return the shared TermIndex."""
+    global _term_index
+    with _term_index_lock:
+        if _term_index is None:
+            _term_index = TermIndex()
+        return _term_index
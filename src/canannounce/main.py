@@ -11,8 +11,8 @@ import socket
 import subprocess
 import time
 import requests
-from canannounce.core.course_utils import get_canvas_courses
-from canannounce.utils.announcement_utils import upload_file_to_course
+from canannounce.core.course_utils import get_canvas_courses, get_upcoming_assignments
+from canannounce.utils.announcement_utils import upload_file_to_course, post_announcement_batch
 from canannounce.config import canvas_token, canvas_base_url
 
 # PyQt imports - only imported when needed
@@ -112,15 +112,20 @@ def run_pyqt_window():
 
 def main():
     parser = argparse.ArgumentParser(description='Canvas Announcement Creator')
-    parser.add_argument('--course-id', type=str, help='Canvas Course ID')
+    parser.add_argument('--course-id', type=str, nargs='+',
+                        help='Canvas Course ID (several IDs, space or comma separated, post to each course)')
     parser.add_argument('--title', type=str, help='Announcement title')
     parser.add_argument('--body', type=str, help='Announcement body text')
     parser.add_argument('--file', type=str, help='File path to upload')
     parser.add_argument('--publish-at', type=str, help='When to publish (ISO format)')
     parser.add_argument('--list-courses', action='store_true', help='List available courses')
+    parser.add_argument('--list-assignments', action='store_true', help='List upcoming assignments for --course-id')
+    parser.add_argument('--days', type=int, help='Days ahead to look for assignments (default: UPCOMING_ASSIGNMENT_DAYS)')
     parser.add_argument('--ui', action='store_true', help='Run with PyQt user interface')
 
     args = parser.parse_args()
+    course_ids = [c for value in (args.course_id or []) for c in value.split(',') if c.strip()]
+    course_ids = [c.strip() for c in course_ids]
 
     # Run PyQt window if requested
     if args.ui:
@@ -140,11 +145,51 @@ def main():
         print("-" * 80)
         return 0
 
+    # List upcoming assignments if requested
+    if args.list_assignments:
+        if not course_ids:
+            parser.print_help()
+            print("\nError: --list-assignments requires --course-id.")
+            return 1
+
+        assignments = get_upcoming_assignments(canvas_token, canvas_base_url, course_ids[0], days=args.days)
+        if not assignments:
+            print("No upcoming assignments found.")
+            return 0
+
+        print("\nUpcoming Assignments:")
+        print("-" * 80)
+        for assignment in assignments:
+            print(f"{assignment.get('due_at_formatted')}  {assignment.get('name')}")
+        print("-" * 80)
+        return 0
+
     # Check required arguments for file upload
-    if args.course_id and args.title and args.body and args.file:
+    if course_ids and args.title and args.body and args.file:
+        if len(course_ids) > 1:
+            results = post_announcement_batch(
+                course_ids=course_ids,
+                title=args.title,
+                body=args.body,
+                file_path=args.file,
+                publish_at=args.publish_at,
+                token=canvas_token,
+                base_url=canvas_base_url
+            )
+
+            failed = 0
+            for course_id, result in results.items():
+                if result.get('success'):
+                    print(f"Course {course_id}: Success (Announcement ID: {result.get('announcement_id')})")
+                else:
+                    failed += 1
+                    print(f"Course {course_id}: Error: {result.get('message')}")
+            print(f"Posted to {len(results) - failed} of {len(results)} courses.")
+            return 1 if failed else 0
+
         with open(args.file, 'rb') as file:
             result = upload_file_to_course(
-                course_id=args.course_id,
+                course_id=course_ids[0],
                 title=args.title,
                 body=args.body,
                 file=file,
@@ -1,9 +1,26 @@
 """
 Utilities for creating and managing Canvas announcements.
 """
-import requests
 import os
+import time
 import datetime
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from ..core.canvas_client import get_canvas_client, upload_timeout
+from ..core.retry import (MAX_RETRIES, NOT_SENT_ERRORS, RETRYABLE_ERRORS, is_rate_limited, is_retryable,
+                          retry_delay, send_with_retry)
+from .file_index import get_upload_index, hash_file
+from .multipart import StreamingMultipartBody, get_file_size
+from .text_utils import extract_course_code, strip_semester
+
+# Number of courses posted to at the same time in batch mode
+BATCH_MAX_WORKERS = 4
+
+# Seconds of clock difference allowed when matching an announcement or file created by a failed attempt
+CLOCK_SKEW = 120
 
 
 def test_canvas_api(token, base_url):
@@ -17,11 +34,8 @@ def test_canvas_api(token, base_url):
     Returns:
         dict: User profile if successful, None otherwise.
     """
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
-    url = f'{base_url}/api/v1/users/self/profile'
-    response = requests.get(url, headers=headers)
+    client = get_canvas_client(token, base_url)
+    response = client.get('/api/v1/users/self/profile')
 
     if response.status_code == 200:
         return response.json()
@@ -29,7 +43,8 @@ def test_canvas_api(token, base_url):
         return None
 
 
-def upload_file_to_course(course_id, title, body, file, publish_at=None, token=None, base_url=None):
+def upload_file_to_course(course_id, title, body, file, publish_at=None, token=None, base_url=None,
+                          progress=None, filename=None, before_announcement=None):
     """
     Upload a file to a Canvas course and create an announcement with the file URL.
 
@@ -37,56 +52,64 @@ def upload_file_to_course(course_id, title, body, file, publish_at=None, token=N
         course_id (str): Canvas course ID
         title (str): Announcement title
         body (str): Announcement body text (HTML)
-        file (FileStorage): Uploaded file object from Flask
+        file (FileStorage or file): Uploaded file object from Flask, or a binary
+            file opened from disk (CLI --file). The file is streamed in chunks,
+            never read into memory as a whole.
         publish_at (str, optional): When to publish the announcement (ISO format)
         token (str): Canvas API token
         base_url (str): Canvas instance base URL
+        progress (UploadProgress, optional): Updated with bytes sent and the
+            pipeline state; finished with the result when the call returns.
+        filename (str, optional): Name to upload the file as. Defaults to the
+            FileStorage filename or the base name of the file on disk.
+        before_announcement (callable, optional): Called just before the
+            announcement is created, e.g. to record that the job must not be
+            run again from the start.
 
     Returns:
-        dict: Result with success flag and message
+        dict: Result with success flag and message. Transient errors have
+            already been retried by the step that hit them, so running the
+            whole call again after a failure does not help.
     """
+    result = _upload_file_to_course(course_id, title, body, file, publish_at, token, base_url, progress, filename,
+                                    before_announcement)
+    if progress is not None:
+        progress.finish(result.get('success', False), result.get('message', ''))
+    return result
+
+
+def _upload_file_to_course(course_id, title, body, file, publish_at, token, base_url, progress, filename,
+                           before_announcement):
+    """Run the file init, file upload and announcement steps for upload_file_to_course."""
     if not token or not base_url:
         return {'success': False, 'message': 'Missing API credentials'}
 
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
+    client = get_canvas_client(token, base_url)
 
     try:
         # Step 1: Upload the file to Canvas
-        filename = file.filename
-
-        # Start the file upload process
-        url = f"{base_url}/api/v1/courses/{course_id}/files"
-        params = {
-            'name': filename,
-            'parent_folder_path': '/uploaded_announcements',
-            'overwrite': True
-        }
-
-        # Get upload URL and parameters
-        init_resp = requests.post(url, headers=headers, params=params)
-        if init_resp.status_code != 200:
-            return {'success': False, 'message': f'Failed to initialize file upload: {init_resp.text}'}
-
-        upload_info = init_resp.json()
-        upload_url = upload_info.get('upload_url')
-        upload_params = upload_info.get('upload_params', {})
-
-        # Upload the file
-        files = {'file': (filename, file)}
-        upload_resp = requests.post(upload_url, data=upload_params, files=files)
-
-        if upload_resp.status_code not in (200, 201, 302):
-            return {'success': False, 'message': f'Failed to upload file: {upload_resp.text}'}
-
-        # Get file URL
-        if upload_resp.status_code == 302:
-            # Follow redirect to get file info
-            location = upload_resp.headers.get('Location')
-            file_info = requests.get(location, headers=headers).json()
+        # Flask's FileStorage has .filename, files opened from disk only have .name
+        filename = filename or getattr(file, 'filename', None) or os.path.basename(getattr(file, 'name', 'upload'))
+        content_type = (getattr(file, 'mimetype', None)
+                        or mimetypes.guess_type(filename)[0]
+                        or 'application/octet-stream')
+        size = get_file_size(file)
+        if progress is not None:
+            progress.total_bytes = size
+            progress.set_state('initializing')
+
+        # Reuse the Canvas file if this exact file was uploaded to the course before
+        sha256 = hash_file(file)
+        upload_index = get_upload_index()
+        file_info = _find_uploaded_file(client, upload_index, sha256, course_id, size)
+        reused = file_info is not None
+        if reused:
+            print(f"File {filename} unchanged, reusing Canvas file {file_info.get('id')}")
         else:
-            file_info = upload_resp.json()
+            file_info, error = _upload_file(client, course_id, file, filename, content_type, size, progress)
+            if error:
+                return {'success': False, 'message': error}
+            upload_index.record(sha256, course_id, file_info)
 
         file_url = file_info.get('url')
 
@@ -97,7 +120,8 @@ def upload_file_to_course(course_id, title, body, file, publish_at=None, token=N
         body = body.replace('[FILE_URL_PLACEHOLDER]', file_url)
 
         # Step 3: Create the announcement
-        announcement_url = f"{base_url}/api/v1/courses/{course_id}/discussion_topics"
+        if progress is not None:
+            progress.set_state('creating_announcement')
         announcement_data = {
             'title': title,
             'message': body,
@@ -113,29 +137,253 @@ def upload_file_to_course(course_id, title, body, file, publish_at=None, token=N
             except ValueError:
                 return {'success': False, 'message': 'Invalid publish date format'}
 
-        # Create the announcement
-        announcement_resp = requests.post(
-            announcement_url,
-            headers=headers,
-            json=announcement_data
-        )
-
-        if announcement_resp.status_code != 200:
-            return {'success': False, 'message': f'Failed to create announcement: {announcement_resp.text}'}
-
-        announcement_info = announcement_resp.json()
+        # Create the announcement; a failure here never repeats the file upload,
+        # and the announcement may exist, so the caller must not run it again
+        if before_announcement is not None:
+            before_announcement()
+        announcement_info, error = _create_announcement(client, course_id, announcement_data)
+        if error:
+            return {'success': False, 'message': error}
 
         return {
             'success': True,
             'message': 'Announcement created successfully',
             'announcement_id': announcement_info.get('id'),
-            'file_url': file_url
+            'file_url': file_url,
+            'file_reused': reused
         }
 
     except Exception as e:
         return {'success': False, 'message': f'Error: {str(e)}'}
 
 
+def _create_announcement(client, course_id, announcement_data):
+    """
+    Create an announcement without ever posting it twice.
+
+    Creating a topic is not idempotent, so the POST is only repeated blindly
+    when Canvas cannot have run it (rate limited, or the connection was never
+    made). After a 5xx, a read timeout or a dropped connection the topic may
+    already exist, so recent announcements are checked before posting again.
+
+    Returns:
+        tuple: (announcement_info, None) on success, (None, error message) on failure
+    """
+    url = f"/api/v1/courses/{course_id}/discussion_topics"
+    started = time.time()
+
+    for attempt in range(MAX_RETRIES + 1):
+        response = None
+        try:
+            response = client.post(url, json=announcement_data)
+        except NOT_SENT_ERRORS as e:
+            reason, may_exist = str(e), False
+        except RETRYABLE_ERRORS as e:
+            reason, may_exist = str(e), True
+        else:
+            if response.status_code == 200:
+                return response.json(), None
+            if not is_retryable(response):
+                return None, f'Failed to create announcement: {response.text}'
+            reason, may_exist = f"status {response.status_code}", not is_rate_limited(response)
+
+        if may_exist:
+            existing = _find_created_announcement(client, course_id, announcement_data['title'], started)
+            if existing is not None:
+                print(f"Announcement creation failed ({reason}) but the announcement exists, not posting again")
+                return existing, None
+
+        if attempt == MAX_RETRIES:
+            return None, f'Failed to create announcement: {response.text if response is not None else reason}'
+
+        delay = retry_delay(attempt, response)
+        print(f"Announcement creation failed ({reason}), retrying in {delay:.1f}s "
+              f"(attempt {attempt + 2} of {MAX_RETRIES + 1})")
+        time.sleep(delay)
+
+
+def _find_created_announcement(client, course_id, title, since):
+    """
+    Return an announcement with this title created at or after since (epoch
+    seconds, allowing for clock skew), or None. A lookup failure returns None.
+    """
+    try:
+        resp = client.request('GET', f"/api/v1/courses/{course_id}/discussion_topics",
+                              params={'only_announcements': 'true', 'per_page': 20})
+        if resp.status_code != 200:
+            return None
+        for topic in resp.json():
+            created_at = topic.get('created_at')
+            if topic.get('title') != title or not created_at:
+                continue
+            created = datetime.datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
+            if created >= since - CLOCK_SKEW:
+                return topic
+    except (RETRYABLE_ERRORS + (ValueError,)) as e:
+        print(f"Could not check for an existing announcement: {e}")
+    return None
+
+
+def _find_uploaded_file(client, upload_index, sha256, course_id, size):
+    """
+    Return the Canvas file info for a previous upload of the same content, or None.
+
+    The indexed file is only reused if Canvas still has it with the same size
+    and modification time; otherwise the stale index entry is dropped.
+    """
+    entry = upload_index.lookup(sha256, course_id)
+    if not entry or not entry.get('file_id'):
+        return None
+
+    # Bypass the response cache: the file may have been deleted or replaced since
+    resp = send_with_retry(lambda: client.request('GET', f"/api/v1/files/{entry['file_id']}"),
+                           description='File lookup')
+    if resp.status_code == 200:
+        file_info = resp.json()
+        if (file_info.get('size') == size and file_info.get('url')
+                and file_info.get('updated_at') == entry.get('updated_at')):
+            return file_info
+
+    print(f"Indexed Canvas file {entry['file_id']} for course {course_id} is gone or changed, uploading again")
+    upload_index.forget(sha256, course_id)
+    return None
+
+
+def _upload_file(client, course_id, file, filename, content_type, size, progress):
+    """
+    Upload a file to the course's announcement folder.
+
+    Returns:
+        tuple: (Canvas file info, None) on success, (None, error message) on failure
+    """
+    # Start the file upload process
+    url = f"/api/v1/courses/{course_id}/files"
+    params = {
+        'name': filename,
+        'size': size,
+        'content_type': content_type,
+        'parent_folder_path': '/uploaded_announcements',
+        'overwrite': True
+    }
+
+    # Storage upload URLs are single-use, so a failed transfer restarts from the init step.
+    # Once the whole file has been sent it may have landed, so Canvas is checked first.
+    started = time.time()
+    for attempt in range(MAX_RETRIES + 1):
+        # Get upload URL and parameters
+        init_resp = send_with_retry(lambda: client.post(url, params=params), description='File upload init')
+        if init_resp.status_code != 200:
+            return None, f'Failed to initialize file upload: {init_resp.text}'
+
+        upload_info = init_resp.json()
+        upload_url = upload_info.get('upload_url')
+        upload_params = upload_info.get('upload_params', {})
+
+        # Stream the file in chunks (the storage host must not receive the Canvas token)
+        upload_body = StreamingMultipartBody(upload_params, filename, file, content_type=content_type,
+                                             callback=progress.update if progress is not None else None)
+        if progress is not None:
+            progress.set_state('uploading')
+
+        upload_resp = None
+        try:
+            upload_resp = client.post(upload_url, data=upload_body,
+                                      headers={'Content-Type': upload_body.content_type},
+                                      authenticate=False, allow_redirects=False, timeout=upload_timeout(size))
+        except RETRYABLE_ERRORS as e:
+            if upload_body.sent:
+                # Storage may still be processing a file it received in full
+                polls = MAX_RETRIES if isinstance(e, requests.exceptions.ReadTimeout) else 0
+                file_info = _find_landed_file(client, course_id, filename, size, started, polls)
+                if file_info is not None:
+                    print(f"File upload failed ({e}) after the file was sent, but Canvas has it")
+                    return file_info, None
+                if polls:
+                    return None, (f'File upload sent but storage did not answer ({e}); '
+                                  f'check the course files before uploading again')
+            if attempt == MAX_RETRIES:
+                raise
+            reason = str(e)
+        else:
+            if attempt == MAX_RETRIES or not is_retryable(upload_resp):
+                break
+            reason = f"status {upload_resp.status_code}"
+
+        delay = retry_delay(attempt, upload_resp)
+        print(f"File upload failed ({reason}), restarting upload in {delay:.1f}s "
+              f"(attempt {attempt + 2} of {MAX_RETRIES + 1})")
+        time.sleep(delay)
+
+    if upload_resp.status_code not in (200, 201, 302):
+        return None, f'Failed to upload file: {upload_resp.text}'
+
+    # Get file info
+    if upload_resp.status_code == 302:
+        # Follow redirect to get file info
+        location = upload_resp.headers.get('Location')
+        return send_with_retry(lambda: client.get(location), description='File upload confirmation').json(), None
+    return upload_resp.json(), None
+
+
+def _find_landed_file(client, course_id, filename, size, since, polls=0):
+    """
+    Return the Canvas file info of an upload of this name and size created at
+    or after since (epoch seconds, allowing for clock skew), or None. The file
+    list is checked again up to polls times, with backoff, while it is missing.
+    """
+    for attempt in range(polls + 1):
+        try:
+            resp = client.request('GET', f"/api/v1/courses/{course_id}/files",
+                                  params={'search_term': filename, 'sort': 'created_at', 'order': 'desc',
+                                          'per_page': 20})
+            if resp.status_code == 200:
+                for file_info in resp.json():
+                    created_at = file_info.get('created_at')
+                    if file_info.get('display_name') != filename or file_info.get('size') != size or not created_at:
+                        continue
+                    created = datetime.datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
+                    if created >= since - CLOCK_SKEW:
+                        return file_info
+        except (RETRYABLE_ERRORS + (ValueError,)) as e:
+            print(f"Could not check for an uploaded file: {e}")
+        if attempt < polls:
+            time.sleep(retry_delay(attempt))
+    return None
+
+
+def post_announcement_batch(course_ids, title, body, file_path, publish_at=None, token=None, base_url=None,
+                            max_workers=BATCH_MAX_WORKERS):
+    """
+    Upload a file and create the same announcement in several courses concurrently.
+
+    Each course gets its own copy of the file (students can only see files in
+    their own course), so the uploads and announcement posts run in parallel.
+
+    Args:
+        course_ids (list): Canvas course IDs to post to
+        title (str): Announcement title
+        body (str): Announcement body text (HTML)
+        file_path (str): Path of the file to upload
+        publish_at (str, optional): When to publish the announcements (ISO format)
+        token (str): Canvas API token
+        base_url (str): Canvas instance base URL
+        max_workers (int): Number of courses posted to at the same time
+
+    Returns:
+        dict: Result of upload_file_to_course for each course ID
+    """
+    def post(course_id):
+        # Each worker streams from its own file handle
+        with open(file_path, 'rb') as file:
+            return upload_file_to_course(course_id, title, body, file, publish_at=publish_at,
+                                         token=token, base_url=base_url)
+
+    workers = max(1, min(max_workers, len(course_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(post, course_ids))
+    return dict(zip(course_ids, results))
+
+
 def calculate_trimmed_title(course_name, max_length=50):
     """
     Generate a trimmed title for announcements based on course name.
@@ -148,38 +396,17 @@ def calculate_trimmed_title(course_name, max_length=50):
     Returns:
         str: Formatted announcement title like "Slides from today JOURN-4734 8/06"
     """
-    import re
-    from datetime import datetime
-
     # Get today's date in (MM/DD/YY) format
-    today = datetime.now()
+    today = datetime.datetime.now()
     date_str = f"({today.month:02d}/{today.day:02d}/{str(today.year)[2:]})"
 
-    # Extract course code from various formats
-    course_code = None
-
-    # Pattern 1: Extract from format like "2025FS-JOURN-4734-01"
-    match = re.search(r'([A-Z]{3,5}-\d{4})', course_name)
-    if match:
-        course_code = match.group(1)
-    else:
-        # Pattern 2: Extract from format like "JOURN 4734" or "JOURN-4734"
-        match = re.search(r'([A-Z]{3,5})\s*[-\s]\s*(\d{4})', course_name)
-        if match:
-            course_code = f"{match.group(1)}-{match.group(2)}"
-        else:
-            # Pattern 3: Fallback - try to extract any course-like pattern
-            match = re.search(r'([A-Z]{3,5}\s*\d{3,4})', course_name)
-            if match:
-                course_code = match.group(1).replace(' ', '-')
+    # Extract course code from formats like "2025FS-JOURN-4734-01" or "JOURN 4734"
+    course_code = extract_course_code(course_name)
 
     # If we couldn't extract a course code, use a cleaned version of the course name
     if not course_code:
         # Remove semester info and clean up
-        clean_name = re.sub(r'\b(Fall|Spring|Summer)\s*\d{4}\b', '', course_name, flags=re.IGNORECASE)
-        clean_name = re.sub(r'\b(FA|SP|SU)\s*\d{2,4}\b', '', clean_name, flags=re.IGNORECASE)
-        clean_name = re.sub(r'^\d{4}[A-Z]{2}-', '', clean_name)  # Remove semester prefix like "2025FS-"
-        clean_name = ' '.join(clean_name.split())
+        clean_name = strip_semester(course_name)
         course_code = clean_name[:20] if clean_name else "Course"
 
     # Create the title
@@ -0,0 +1,34 @@
+"""
+Async counterparts of the quiz fetchers in quiz_utils.
+"""
+from canannounce.core.async_course_utils import run_blocking
+from canannounce.utils import quiz_utils
+
+
+async def get_canvas_quizzes(course_id, token, base_url):
+    """Async version of quiz_utils.get_canvas_quizzes."""
+    return await run_blocking(quiz_utils.get_canvas_quizzes, course_id, token, base_url)
+
+
+async def get_quiz_questions(course_id, quiz_id, token, base_url):
+    """Async version of quiz_utils.get_quiz_questions."""
+    return await run_blocking(quiz_utils.get_quiz_questions, course_id, quiz_id, token, base_url)
+
+
+async def get_new_quizzes(course_id, token, base_url):
+    """Async version of quiz_utils.get_new_quizzes."""
+    return await run_blocking(quiz_utils.get_new_quizzes, course_id, token, base_url)
+
+
+async def get_upcoming_quizzes(course_id, token, base_url):
+    """Async version of quiz_utils.get_upcoming_quizzes."""
+    return await run_blocking(quiz_utils.get_upcoming_quizzes, course_id, token, base_url)
+
+
+async def get_next_quiz_question(course_id):
+    """
+    Async version of quiz_utils.get_next_quiz_question.
+    The quiz list and question list are dependent calls, so they run in sequence
+    on the worker pool while other course data is fetched alongside.
+    """
+    return await run_blocking(quiz_utils.get_next_quiz_question, course_id)
@@ -0,0 +1,102 @@
+"""
+Content-hash index of files already uploaded to Canvas.
+
+Instructors often attach the same deck again (a re-post, a second section,
+a fixed typo in the body). The index maps a file's SHA-256 to the Canvas
+file uploaded for it in each course, so an unchanged file can reuse the
+existing Canvas URL instead of being uploaded again. Entries are checked
+against the Canvas file metadata before reuse, so a file that was deleted
+or replaced in Canvas is simply uploaded again.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from ..config.settings_manager import get_user_config_dir
+from .multipart import CHUNK_SIZE
+
+INDEX_FILENAME = 'upload_index.json'
+
+_upload_index = None
+_upload_index_lock = threading.Lock()
+
+
+def hash_file(fileobj, chunk_size=CHUNK_SIZE):
+    """Return the SHA-256 hex digest of fileobj from its current position, then rewind to it."""
+    start = fileobj.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        digest.update(chunk)
+    fileobj.seek(start)
+    return digest.hexdigest()
+
+
+class UploadIndex:
+    """
+    JSON-backed map of file hash -> course ID -> uploaded Canvas file.
+
+    Args:
+        path (str or Path, optional): Index file location. Defaults to
+            upload_index.json in the user config directory.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or (get_user_config_dir() / INDEX_FILENAME))
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _write(self, index):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(self.path + '.tmp', self.path)
+
+    def lookup(self, sha256, course_id):
+        """Return the recorded Canvas file for a hash in a course, or None."""
+        with self._lock:
+            return self._load().get(sha256, {}).get(str(course_id))
+
+    def record(self, sha256, course_id, file_info):
+        """Remember the Canvas file uploaded for a hash in a course."""
+        entry = {
+            'file_id': file_info.get('id'),
+            'url': file_info.get('url'),
+            'size': file_info.get('size'),
+            'updated_at': file_info.get('updated_at')
+        }
+        with self._lock:
+            index = self._load()
+            index.setdefault(sha256, {})[str(course_id)] = entry
+            try:
+                self._write(index)
+            except IOError as e:
+                print(f"Warning: Could not update upload index: {e}")
+
+    def forget(self, sha256, course_id):
+        """Drop the entry for a hash in a course (e.g. the Canvas file is gone)."""
+        with self._lock:
+            index = self._load()
+            if index.get(sha256, {}).pop(str(course_id), None) is None:
+                return
+            if not index[sha256]:
+                del index[sha256]
+            try:
+                self._write(index)
+            except IOError as e:
+                print(f"Warning: Could not update upload index: {e}")
+
+
+def get_upload_index():
+    """Return the shared UploadIndex."""
+    global _upload_index
+    with _upload_index_lock:
+        if _upload_index is None:
+            _upload_index = UploadIndex()
+        return _upload_index
@@ -0,0 +1,98 @@
+"""
+Streaming multipart/form-data encoder for large file uploads.
+
+requests builds the whole multipart body in memory when given files=..., so
+an 800 MB lecture deck costs 800 MB of RAM. StreamingMultipartBody instead
+yields the body in fixed-size chunks read straight from the file, with a
+known Content-Length, so peak memory does not depend on the file size.
+"""
+import io
+import os
+import uuid
+
+# Bytes read from the file per chunk
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_size(fileobj):
+    """Return the number of bytes left to read from the current position of fileobj."""
+    position = fileobj.tell()
+    try:
+        return os.fstat(fileobj.fileno()).st_size - position
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        end = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(position)
+        return end - position
+
+
+def _quote(value):
+    return str(value).replace('\\', '\\\\').replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+class StreamingMultipartBody:
+    """
+    Iterable multipart/form-data body that streams a single file.
+
+    Args:
+        fields (dict): Plain form fields sent before the file (e.g. Canvas upload_params).
+        filename (str): Name reported for the file part.
+        fileobj: Binary file object positioned at the start of the data.
+        content_type (str): MIME type of the file part.
+        file_field (str): Form field name for the file part.
+        chunk_size (int): Bytes read from the file per chunk.
+        callback (callable, optional): Called with the number of file bytes
+            sent after each chunk.
+
+    The body can be iterated more than once (e.g. to retry a request); each
+    pass rewinds the file to where it started. sent is True once the last
+    chunk of the current pass has been handed to the connection.
+    """
+
+    def __init__(self, fields, filename, fileobj, content_type='application/octet-stream',
+                 file_field='file', chunk_size=CHUNK_SIZE, callback=None):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.callback = callback
+        self._start = fileobj.tell()
+        self.file_size = get_file_size(fileobj)
+        self.sent = False
+
+        parts = []
+        for name, value in (fields or {}).items():
+            parts.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        parts.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{_quote(file_field)}"; filename="{_quote(filename)}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self._preamble = ''.join(parts).encode('utf-8')
+        self._epilogue = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+
+    def __len__(self):
+        # requests uses this to send a Content-Length header instead of chunked encoding
+        return len(self._preamble) + self.file_size + len(self._epilogue)
+
+    def __iter__(self):
+        self.sent = False
+        self.fileobj.seek(self._start)
+        yield self._preamble
+
+        sent = 0
+        while sent < self.file_size:
+            chunk = self.fileobj.read(min(self.chunk_size, self.file_size - sent))
+            if not chunk:
+                raise IOError(f"File ended after {sent} of {self.file_size} bytes")
+            sent += len(chunk)
+            yield chunk
+            if self.callback:
+                self.callback(sent)
+
+        yield self._epilogue
+        # Runs when the connection asks for the chunk after the last one
+        self.sent = True
@@ -0,0 +1,121 @@
+"""
+Practice question sampling without replacement, persisted across sessions.
+
+Picking with random.choice repeats some questions over a semester while
+others are never shown. The sampler keeps, per course, a shuffled queue of
+the question pool's indices and pops one per pick, so every question is
+shown once before any repeats. When the queue runs out a new shuffled
+cycle starts (never opening with the question just shown), and when the
+pool changes (the next quiz is a different one, or it was edited) the
+cycle restarts on the new pool. The queues are stored in the user config
+directory so the cycle continues after a restart.
+"""
+import json
+import os
+import random
+import threading
+from collections import deque
+
+from ..config.settings_manager import get_user_config_dir
+
+SAMPLER_FILENAME = 'question_sampler.json'
+
+_question_sampler = None
+_question_sampler_lock = threading.Lock()
+
+
+class QuestionSampler:
+    """
+    JSON-backed map of course ID -> shuffled queue of question indices.
+
+    Args:
+        path (str or Path, optional): State file location. Defaults to
+            question_sampler.json in the user config directory.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or (get_user_config_dir() / SAMPLER_FILENAME))
+        self._lock = threading.Lock()
+        self._courses = None
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            state = {}
+        courses = {}
+        for course_id, entry in state.items():
+            try:
+                courses[course_id] = {
+                    'pool_id': entry['pool_id'],
+                    'size': entry['size'],
+                    'remaining': deque(entry['remaining']),
+                    'last': entry.get('last')
+                }
+            except (KeyError, TypeError):
+                continue
+        return courses
+
+    def _write(self):
+        state = {
+            course_id: dict(entry, remaining=list(entry['remaining']))
+            for course_id, entry in self._courses.items()
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    @staticmethod
+    def _new_cycle(size, last=None):
+        order = list(range(size))
+        random.shuffle(order)
+        # Don't show the same question twice in a row across cycles
+        if size > 1 and order[0] == last:
+            order[0], order[-1] = order[-1], order[0]
+        return deque(order)
+
+    def next_question(self, course_id, pool, pool_id):
+        """
+        Return the next question of the course's current cycle.
+
+        Args:
+            course_id (str): Canvas course ID
+            pool (list): Questions to choose from
+            pool_id (str): Identifies the pool; a different value starts a new cycle
+
+        Returns:
+            str: The selected question, or None if the pool is empty
+        """
+        if not pool:
+            return None
+
+        with self._lock:
+            if self._courses is None:
+                self._courses = self._load()
+
+            entry = self._courses.get(str(course_id))
+            if entry is None or entry['pool_id'] != pool_id or entry['size'] != len(pool):
+                entry = {'pool_id': pool_id, 'size': len(pool), 'remaining': self._new_cycle(len(pool)), 'last': None}
+                self._courses[str(course_id)] = entry
+            elif not entry['remaining']:
+                entry['remaining'] = self._new_cycle(len(pool), entry['last'])
+
+            index = entry['remaining'].popleft()
+            entry['last'] = index
+            try:
+                self._write()
+            except IOError as e:
+                print(f"Warning: Could not save question sampler state: {e}")
+
+        return pool[index]
+
+
+def get_question_sampler():
+    """Return the shared QuestionSampler."""
+    global _question_sampler
+    with _question_sampler_lock:
+        if _question_sampler is None:
+            _question_sampler = QuestionSampler()
+        return _question_sampler
@@ -1,11 +1,47 @@
 """
 Quiz utilities for extracting questions from Canvas quizzes.
+
+Questions come from two quiz providers: Classic Quizzes (/api/v1 quizzes
+and questions) and New Quizzes (the /api/quiz/v1 quizzes and items API).
+Both are queried concurrently and their upcoming quizzes merged by due date.
+
+The cleaned questions of each quiz are kept in a question pool in the disk
+cache, tagged with the quiz's version. The pool is only refetched when the
+quiz list reports a new version, so picking a practice question is
+normally answered locally. New Quizzes report no version, so their pools
+are refetched after QUESTION_POOL_MAX_AGE.
 """
-import random
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from canannounce.config import canvas_token, canvas_base_url
+from canannounce.core.canvas_client import get_canvas_client
+from canannounce.core.pagination import fetch_all_pages, PaginationError
+from canannounce.core.disk_cache import get_disk_cache, cache_key, QUIZZES_MAX_AGE
+from canannounce.utils.question_sampler import get_question_sampler
+from canannounce.utils.text_utils import html_to_text
+
+# Bumped when the cleaning of pooled questions changes, so older pools are rebuilt
+QUESTION_POOL_FORMAT = 2
+
+# Seconds before the pool of a quiz without a version is refetched
+QUESTION_POOL_MAX_AGE = 3600
+
+
+def _parse_due_at(quiz):
+    return datetime.fromisoformat(quiz['due_at'].replace('Z', '+00:00'))
+
+
+def _upcoming(quizzes, provider):
+    """Keep the quizzes due in the future, tagged with their provider and sorted by due date."""
+    now = datetime.now(timezone.utc)
+    upcoming_quizzes = []
+    for quiz in quizzes:
+        if quiz.get('due_at') and _parse_due_at(quiz) > now:
+            upcoming_quizzes.append(dict(quiz, provider=provider))
+    upcoming_quizzes.sort(key=_parse_due_at)
+    return upcoming_quizzes
 
 
 def get_canvas_quizzes(course_id, token, base_url):
@@ -20,32 +56,15 @@ def get_canvas_quizzes(course_id, token, base_url):
     Returns:
         list: List of upcoming quizzes sorted by due date
     """
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
-    url = f"{base_url}/api/v1/courses/{course_id}/quizzes"
+    client = get_canvas_client(token, base_url)
+    url = f"/api/v1/courses/{course_id}/quizzes"
 
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            quizzes = response.json()
-
-            # Filter for upcoming quizzes with due dates
-            now = datetime.now(timezone.utc)
-            upcoming_quizzes = []
-
-            for quiz in quizzes:
-                if quiz.get('due_at'):
-                    due_date = datetime.fromisoformat(quiz['due_at'].replace('Z', '+00:00'))
-                    if due_date > now:
-                        upcoming_quizzes.append(quiz)
-
-            # Sort by due date (earliest first)
-            upcoming_quizzes.sort(key=lambda x: x['due_at'])
-            return upcoming_quizzes
-        else:
-            print(f"Failed to fetch quizzes. Status code: {response.status_code}")
-            return []
+        quizzes = fetch_all_pages(client, url, params={'per_page': 100})
+        return _upcoming(quizzes, 'classic')
+    except PaginationError as e:
+        print(f"Failed to fetch quizzes. Status code: {e.status_code}")
+        return []
     except Exception as e:
         print(f"Error fetching quizzes: {e}")
         return []
@@ -64,69 +83,231 @@ def get_quiz_questions(course_id, quiz_id, token, base_url):
     Returns:
         list: List of quiz questions
     """
-    headers = {
-        'Authorization': f'Bearer {token}'
-    }
-    url = f"{base_url}/api/v1/courses/{course_id}/quizzes/{quiz_id}/questions"
+    client = get_canvas_client(token, base_url)
+    url = f"/api/v1/courses/{course_id}/quizzes/{quiz_id}/questions"
 
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Failed to fetch quiz questions. Status code: {response.status_code}")
-            return []
+        return fetch_all_pages(client, url, params={'per_page': 100})
+    except PaginationError as e:
+        print(f"Failed to fetch quiz questions. Status code: {e.status_code}")
+        return []
     except Exception as e:
         print(f"Error fetching quiz questions: {e}")
         return []
 
 
-def get_next_quiz_question(course_id):
+def get_new_quizzes(course_id, token, base_url):
     """
-    Get a random question from the next upcoming quiz in the course.
+    Fetch upcoming New Quizzes for a specific course from the New Quizzes API.
 
     Args:
         course_id (str): Canvas course ID
+        token (str): Canvas API access token
+        base_url (str): Canvas base URL
 
     Returns:
-        str: A random quiz question from the next due quiz, or None if no questions found
+        list: List of upcoming New Quizzes sorted by due date
     """
+    client = get_canvas_client(token, base_url)
+    url = f"/api/quiz/v1/courses/{course_id}/quizzes"
+
     try:
-        quizzes = get_canvas_quizzes(course_id, canvas_token, canvas_base_url)
-        if not quizzes:
-            return None
+        quizzes = fetch_all_pages(client, url, params={'per_page': 100})
+        return _upcoming(quizzes, 'new_quizzes')
+    except PaginationError as e:
+        # Courses or instances without New Quizzes answer 404
+        if e.status_code != 404:
+            print(f"Failed to fetch New Quizzes. Status code: {e.status_code}")
+        return []
+    except Exception as e:
+        print(f"Error fetching New Quizzes: {e}")
+        return []
 
-        # Get the next quiz (first in the sorted list)
-        next_quiz = quizzes[0]
-        print(f"DEBUG: Getting questions from next quiz: '{next_quiz['title']}' due {next_quiz['due_at']}")
 
-        # Get questions from only the next quiz
-        questions = get_quiz_questions(course_id, next_quiz['id'], canvas_token, canvas_base_url)
-        if not questions:
-            print(f"DEBUG: No questions found in next quiz '{next_quiz['title']}'")
-            return None
+def get_new_quiz_items(course_id, quiz_id, token, base_url):
+    """
+    Fetch the items of a New Quiz. Pages are requested concurrently.
 
-        # Filter for questions with text content
-        text_questions = [q for q in questions if q.get('question_text')]
-        print(f"DEBUG: Found {len(text_questions)} text questions in next quiz")
+    Args:
+        course_id (str): Canvas course ID
+        quiz_id (str): New Quiz ID (the ID of its assignment)
+        token (str): Canvas API access token
+        base_url (str): Canvas base URL
+
+    Returns:
+        list: List of quiz items
+    """
+    client = get_canvas_client(token, base_url)
+    url = f"/api/quiz/v1/courses/{course_id}/quizzes/{quiz_id}/items"
+
+    try:
+        return fetch_all_pages(client, url, params={'per_page': 100})
+    except PaginationError as e:
+        print(f"Failed to fetch New Quiz items. Status code: {e.status_code}")
+        return []
+    except Exception as e:
+        print(f"Error fetching New Quiz items: {e}")
+        return []
+
+
+def _classic_question_html(course_id, quiz, token, base_url):
+    return [question.get('question_text') for question in
+            get_quiz_questions(course_id, quiz['id'], token, base_url)]
+
+
+def _new_quiz_question_html(course_id, quiz, token, base_url):
+    # Stimulus passages and question bank references carry no question text
+    return [(item.get('entry') or {}).get('item_body') for item in
+            get_new_quiz_items(course_id, quiz['id'], token, base_url)
+            if item.get('entry_type') == 'Item']
 
-        if text_questions:
-            # Select a random question
-            selected_question = random.choice(text_questions)
-            question_text = selected_question.get('question_text', '')
 
-            # Clean up HTML tags if present
-            import re
-            question_text = re.sub(r'<[^>]+>', '', question_text)
-            question_text = question_text.strip()
+# Quiz providers: name -> (fetch upcoming quizzes, fetch the question HTML of a quiz)
+QUIZ_PROVIDERS = {
+    'classic': (get_canvas_quizzes, _classic_question_html),
+    'new_quizzes': (get_new_quizzes, _new_quiz_question_html),
+}
+
+
+def get_upcoming_quizzes(course_id, token, base_url):
+    """
+    Fetch the upcoming quizzes of every quiz provider concurrently.
+
+    Args:
+        course_id (str): Canvas course ID
+        token (str): Canvas API access token
+        base_url (str): Canvas base URL
+
+    Returns:
+        list: Upcoming quizzes of all providers, each with a 'provider' key,
+            sorted by due date
+    """
+    with ThreadPoolExecutor(max_workers=len(QUIZ_PROVIDERS)) as executor:
+        results = list(executor.map(lambda fetch: fetch(course_id, token, base_url),
+                                    [fetch for fetch, _ in QUIZ_PROVIDERS.values()]))
+    return sorted((quiz for quizzes in results for quiz in quizzes), key=_parse_due_at)
 
-            # Return the question if it has meaningful content
-            if question_text and len(question_text) > 10:
-                print(f"DEBUG: Selected question from quiz '{next_quiz['title']}': {question_text[:50]}...")
-                return question_text
 
-        print(f"DEBUG: No suitable questions found in next quiz '{next_quiz['title']}'")
+def clean_question_text(question_text):
+    """Convert a question's HTML to plain text, decoding entities."""
+    return html_to_text(question_text)
+
+
+def question_pool_version(quiz):
+    """
+    Return a string that changes whenever a quiz's questions may have changed,
+    or None if the quiz reports nothing to detect changes with.
+
+    Canvas bumps version_number when a classic quiz is edited and saved;
+    question_count and updated_at (when present) catch the remaining cases.
+    """
+    if all(quiz.get(field) is None for field in ('version_number', 'question_count', 'updated_at')):
         return None
+    return (f"{QUESTION_POOL_FORMAT}:{quiz.get('version_number')}:"
+            f"{quiz.get('question_count')}:{quiz.get('updated_at')}")
+
+
+def get_question_pool(course_id, quiz, token, base_url):
+    """
+    Return the cleaned questions of a quiz, refetching them only when the quiz changed.
+
+    Args:
+        course_id (str): Canvas course ID
+        quiz (dict): Quiz from get_upcoming_quizzes
+        token (str): Canvas API access token
+        base_url (str): Canvas base URL
+
+    Returns:
+        list: Question texts with HTML removed, skipping very short questions
+    """
+    provider = quiz.get('provider', 'classic')
+    disk_cache = get_disk_cache()
+    key = cache_key(token, base_url, 'question_pool', course_id, provider, quiz['id'])
+    version = question_pool_version(quiz)
+
+    cached = disk_cache.get(key)
+    if cached is not None:
+        stored, stored_at = cached
+        if version is not None and stored.get('version') == version:
+            return stored['questions']
+        if version is None and stored.get('format') == QUESTION_POOL_FORMAT \
+                and time.time() - stored_at <= QUESTION_POOL_MAX_AGE:
+            return stored['questions']
+
+    print(f"DEBUG: Refreshing question pool for quiz '{quiz.get('title')}'")
+    _, fetch_question_html = QUIZ_PROVIDERS[provider]
+    question_html = fetch_question_html(course_id, quiz, token, base_url)
+
+    pool = []
+    for question in question_html:
+        question_text = clean_question_text(question)
+        # Keep only questions with meaningful content
+        if len(question_text) > 10:
+            pool.append(question_text)
+
+    # An empty list may be a failed fetch, so only non-empty pools are stored
+    if pool:
+        disk_cache.set(key, {'version': version, 'format': QUESTION_POOL_FORMAT, 'questions': pool})
+    return pool
+
+
+def get_next_quiz_pool(course_id):
+    """
+    Return the next upcoming quiz in the course, Classic or New Quizzes,
+    and its question pool.
+
+    Args:
+        course_id (str): Canvas course ID
+
+    Returns:
+        tuple: (quiz, questions), or (None, []) if there is no upcoming quiz
+    """
+    # Quiz metadata is served from disk and refreshed in the background
+    quizzes = get_disk_cache().get_or_refresh(
+        cache_key(canvas_token, canvas_base_url, 'quizzes', course_id),
+        lambda: get_upcoming_quizzes(course_id, canvas_token, canvas_base_url),
+        QUIZZES_MAX_AGE
+    )
+
+    # Cached quizzes may have come due since they were stored
+    now = datetime.now(timezone.utc)
+    quizzes = [q for q in quizzes or [] if _parse_due_at(q) > now]
+    if not quizzes:
+        return None, []
+
+    # Get the next quiz (first in the sorted list)
+    next_quiz = quizzes[0]
+    print(f"DEBUG: Getting questions from next quiz: '{next_quiz['title']}' due {next_quiz['due_at']}")
+
+    # Questions come from the cached pool unless the quiz has changed
+    return next_quiz, get_question_pool(course_id, next_quiz, canvas_token, canvas_base_url)
+
+
+def get_next_quiz_question(course_id):
+    """
+    Get the next practice question from the next upcoming quiz in the course.
+    Questions are drawn without replacement, so every question of the quiz
+    is shown once before any repeats (see question_sampler).
+
+    Args:
+        course_id (str): Canvas course ID
+
+    Returns:
+        str: A quiz question from the next due quiz, or None if no questions found
+    """
+    try:
+        next_quiz, pool = get_next_quiz_pool(course_id)
+        if next_quiz is None:
+            return None
+        if not pool:
+            print(f"DEBUG: No suitable questions found in next quiz '{next_quiz['title']}'")
+            return None
+
+        # The pool id changes with the quiz, so a new quiz starts a new cycle
+        pool_id = f"{next_quiz.get('provider', 'classic')}:{next_quiz['id']}:{question_pool_version(next_quiz)}"
+        question_text = get_question_sampler().next_question(course_id, pool, pool_id)
+        print(f"DEBUG: Selected question from quiz '{next_quiz['title']}' ({len(pool)} in pool): {question_text[:50]}...")
+        return question_text
 
     except Exception as e:
         print(f"Error getting quiz question: {e}")
@@ -0,0 +1,103 @@
+"""
+Text cleaning for quiz questions and announcement titles.
+
+All patterns are compiled once at import. Tag patterns cannot run past the
+next '<' and script/style elements are removed by searching forward for
+their closing tag, so cleaning a question costs time linear in its length,
+even for malformed markup with unclosed tags.
+Character references (&amp;, &nbsp;, &#8217; ...) are decoded with
+html.unescape after the tags are removed. Text without markup or entities
+skips the tag patterns and the decoding.
+"""
+import html
+import re
+
+# Course codes, tried in order: "2025FS-JOURN-4734-01", "JOURN 4734", "JOURN473"
+COURSE_CODE_PATTERNS = (
+    (re.compile(r'([A-Z]{3,5}-\d{4})'), lambda m: m.group(1)),
+    (re.compile(r'([A-Z]{3,5})\s*[-\s]\s*(\d{4})'), lambda m: f"{m.group(1)}-{m.group(2)}"),
+    (re.compile(r'([A-Z]{3,5}\s*\d{3,4})'), lambda m: m.group(1).replace(' ', '-')),
+)
+
+# Semester information removed from course names without a course code
+SEMESTER_NAME_PATTERNS = (
+    re.compile(r'\b(Fall|Spring|Summer)\s*\d{4}\b', re.IGNORECASE),
+    re.compile(r'\b(FA|SP|SU)\s*\d{2,4}\b', re.IGNORECASE),
+    re.compile(r'^\d{4}[A-Z]{2}-'),  # Semester prefix like "2025FS-"
+)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Elements whose content is not text; the closing tag is searched for separately
+SKIPPED_ELEMENT_OPEN_PATTERN = re.compile(r'<(script|style)\b[^<>]*>', re.IGNORECASE)
+SKIPPED_ELEMENT_CLOSE_PATTERNS = {
+    name: re.compile(rf'</{name}\s*>', re.IGNORECASE) for name in ('script', 'style')
+}
+# Tags that separate words when the markup is removed. Tag patterns stop at the
+# next '<', so an unclosed tag never makes a pass rescan the rest of the text
+BLOCK_TAG_PATTERN = re.compile(
+    r'</?(?:p|br|div|li|ul|ol|tr|td|th|table|h[1-6]|blockquote|pre|hr)\b[^<>]*>', re.IGNORECASE
+)
+TAG_PATTERN = re.compile(r'<[^<>]*>')
+
+
+def _remove_skipped_elements(text):
+    """Remove script and style elements, scanning the text once."""
+    parts = []
+    position = 0
+    while True:
+        opening = SKIPPED_ELEMENT_OPEN_PATTERN.search(text, position)
+        if opening is None:
+            break
+        parts.append(text[position:opening.start()])
+        closing = SKIPPED_ELEMENT_CLOSE_PATTERNS[opening.group(1).lower()].search(text, opening.end())
+        if closing is None:
+            # An unclosed element runs to the end of the text, as in a browser
+            return ''.join(parts)
+        position = closing.end()
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def html_to_text(html_text):
+    """
+    Convert an HTML fragment to a single line of plain text.
+
+    Args:
+        html_text (str): HTML such as a Canvas question_text
+
+    Returns:
+        str: Text with tags removed, entities decoded and whitespace collapsed
+    """
+    if not html_text:
+        return ''
+    text = html_text
+    if '<' in text:
+        text = _remove_skipped_elements(text)
+        text = BLOCK_TAG_PATTERN.sub(' ', text)
+        text = TAG_PATTERN.sub('', text)
+    if '&' in text:
+        text = html.unescape(text)
+    # Non-breaking spaces from &nbsp; are collapsed along with other whitespace
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def extract_course_code(course_name):
+    """
+    Extract a course code like "JOURN-4734" from a Canvas course name.
+
+    Returns:
+        str: The course code, or None if the name has none
+    """
+    for pattern, build in COURSE_CODE_PATTERNS:
+        match = pattern.search(course_name)
+        if match:
+            return build(match)
+    return None
+
+
+def strip_semester(course_name):
+    """Remove semester names and prefixes from a course name and collapse whitespace."""
+    for pattern in SEMESTER_NAME_PATTERNS:
+        course_name = pattern.sub('', course_name)
+    return ' '.join(course_name.split())
@@ -0,0 +1,218 @@
+"""
+Background job queue for announcement uploads.
+
+/submit spools the uploaded file to disk once, records a job per target
+course and returns the job ids immediately; a worker pool then runs the
+upload pipeline (file init, file upload, announcement creation) once per
+job, each step retrying its own transient errors. Jobs are persisted as JSON in
+the user config directory, so queued jobs survive a restart and are resumed
+by the next app instance. The Canvas token is never written to disk; it is
+looked up through a credentials callable when a job runs.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config.settings_manager import get_user_config_dir
+from .announcement_utils import upload_file_to_course
+from .multipart import CHUNK_SIZE
+from .upload_progress import create_upload_progress
+
+JOBS_DIRNAME = 'upload_jobs'
+
+# Number of uploads that run at the same time (e.g. several sections)
+JOB_WORKERS = 3
+# Finished job records are deleted after this many seconds
+JOB_RETENTION = 7 * 24 * 3600
+
+
+class UploadJobQueue:
+    """
+    Persistent queue of announcement upload jobs executed by a worker pool.
+
+    Args:
+        credentials (callable): Returns (token, base_url) for running jobs.
+        jobs_dir (str or Path, optional): Where jobs and spooled files are kept.
+            Defaults to upload_jobs/ in the user config directory.
+        max_workers (int): Number of jobs run concurrently.
+    """
+
+    def __init__(self, credentials, jobs_dir=None, max_workers=JOB_WORKERS):
+        self.credentials = credentials
+        self.jobs_dir = jobs_dir or (get_user_config_dir() / JOBS_DIRNAME)
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload-job')
+        self._lock = threading.Lock()
+        self._batch_lock = threading.Lock()
+        self._resumed = False
+
+    def _job_path(self, job_id):
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    def _save(self, job):
+        # Write to a temporary file first so a crash never leaves a truncated job
+        path = self._job_path(job['id'])
+        with self._lock:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(job, f, indent=2)
+            os.replace(path + '.tmp', path)
+
+    def get_job(self, job_id):
+        """Return the job dict for an id, or None if unknown."""
+        try:
+            with self._lock, open(self._job_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def submit(self, course_id, title, body, file, filename, publish_at=None):
+        """
+        Spool a file to disk and queue an upload job for it.
+
+        Args:
+            course_id (str): Canvas course ID
+            title (str): Announcement title
+            body (str): Announcement body text (HTML)
+            file: File object to spool (Flask FileStorage or binary file)
+            filename (str): Name to upload the file as
+            publish_at (str, optional): When to publish the announcement
+
+        Returns:
+            dict: The queued job.
+        """
+        return self.submit_batch([course_id], title, body, file, filename, publish_at)[0]
+
+    def submit_batch(self, course_ids, title, body, file, filename, publish_at=None):
+        """
+        Spool a file to disk once and queue one upload job per course.
+        The jobs share the spooled file and run concurrently on the worker pool.
+
+        Returns:
+            list: The queued jobs, in course_ids order.
+        """
+        batch_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.jobs_dir, f'{batch_id}.upload')
+        with open(spool_path, 'wb') as spool:
+            shutil.copyfileobj(file, spool, CHUNK_SIZE)
+
+        jobs = []
+        for course_id in course_ids:
+            job = {
+                'id': uuid.uuid4().hex,
+                'batch_id': batch_id,
+                'course_id': course_id,
+                'title': title,
+                'body': body,
+                'filename': filename,
+                'publish_at': publish_at,
+                'spool_path': spool_path,
+                'state': 'queued',
+                'attempts': 0,
+                'created_at': time.time(),
+                'finished_at': None,
+                'result': None
+            }
+            self._save(job)
+            jobs.append(job)
+
+        for job in jobs:
+            self._executor.submit(self._run, job['id'])
+        return jobs
+
+    def _batch_finished(self, batch_id):
+        """Return True if no job of a batch is still waiting to use its spooled file."""
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith('.json'):
+                continue
+            job = self.get_job(name[:-len('.json')])
+            if job and job.get('batch_id') == batch_id and job['state'] not in ('done', 'failed'):
+                return False
+        return True
+
+    def resume_pending(self):
+        """
+        Re-queue jobs left queued or running by a previous app instance and
+        prune old finished jobs. Only the first call has any effect.
+        """
+        with self._lock:
+            if self._resumed:
+                return
+            self._resumed = True
+
+        now = time.time()
+        for name in sorted(os.listdir(self.jobs_dir)):
+            if not name.endswith('.json'):
+                continue
+            job = self.get_job(name[:-len('.json')])
+            if not job:
+                continue
+            if job['state'] in ('queued', 'running') and job.get('announcement_started'):
+                # The announcement may have been created before the app stopped
+                print(f"Upload job {job['id']} was interrupted while creating the announcement, not resuming")
+                job['state'] = 'failed'
+                job['result'] = {'success': False,
+                                 'message': 'Interrupted while creating the announcement; '
+                                            'check Canvas before posting again'}
+                job['finished_at'] = now
+                self._save(job)
+                self._remove_spool_if_finished(job)
+            elif job['state'] in ('queued', 'running'):
+                # Interrupted before the announcement step, so running it again is safe
+                print(f"Resuming upload job {job['id']} for course {job['course_id']}")
+                self._executor.submit(self._run, job['id'])
+            elif job.get('finished_at') and now - job['finished_at'] > JOB_RETENTION:
+                os.remove(self._job_path(job['id']))
+
+    def _run(self, job_id):
+        job = self.get_job(job_id)
+        if job is None:
+            return
+
+        job['state'] = 'running'
+        job['attempts'] += 1
+        self._save(job)
+
+        token, base_url = self.credentials()
+        progress = create_upload_progress(job_id, job['course_id'], job['filename'])
+
+        def before_announcement():
+            job['announcement_started'] = True
+            self._save(job)
+
+        # Transient errors are retried inside each step, so a failed job is not run again
+        try:
+            with open(job['spool_path'], 'rb') as spool:
+                result = upload_file_to_course(
+                    course_id=job['course_id'],
+                    title=job['title'],
+                    body=job['body'],
+                    file=spool,
+                    filename=job['filename'],
+                    publish_at=job['publish_at'],
+                    token=token,
+                    base_url=base_url,
+                    progress=progress,
+                    before_announcement=before_announcement
+                )
+        except IOError as e:
+            result = {'success': False, 'message': f'Error reading spooled file: {e}'}
+
+        job['state'] = 'done' if result.get('success') else 'failed'
+        job['result'] = result
+        job['finished_at'] = time.time()
+        self._save(job)
+
+        self._remove_spool_if_finished(job)
+
+    def _remove_spool_if_finished(self, job):
+        # The spooled file is shared by every job of the batch
+        with self._batch_lock:
+            if self._batch_finished(job.get('batch_id', job['id'])):
+                try:
+                    os.remove(job['spool_path'])
+                except OSError:
+                    pass
@@ -0,0 +1,168 @@
+"""
+Progress tracking and throughput statistics for announcement file uploads.
+
+Each upload gets an UploadProgress that the streaming multipart encoder
+updates as chunks are sent. The web layer polls it by id to show bytes
+sent, MB/s and ETA. Finished uploads are appended to upload_stats.jsonl in
+the user config directory so slow network paths can be spotted later; the
+file is trimmed to the newest entries once it grows past STATS_MAX_BYTES.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from ..config.settings_manager import get_user_config_dir
+
+STATS_FILENAME = 'upload_stats.jsonl'
+# Size at which the stats file is trimmed, and the number of entries kept
+STATS_MAX_BYTES = 256 * 1024
+STATS_KEEP_ENTRIES = 500
+
+# Finished uploads are kept in memory for polling this long (seconds)
+PROGRESS_RETENTION = 600
+
+_uploads = {}
+_uploads_lock = threading.Lock()
+_stats_lock = threading.Lock()
+
+
+class UploadProgress:
+    """
+    Live progress of one announcement upload.
+
+    Args:
+        upload_id (str): Identifier used by clients to poll progress.
+        course_id (str): Canvas course ID the file is uploaded to.
+        filename (str): Name of the uploaded file.
+        total_bytes (int): File size in bytes.
+    """
+
+    def __init__(self, upload_id, course_id, filename, total_bytes=0):
+        self.upload_id = upload_id
+        self.course_id = course_id
+        self.filename = filename
+        self.total_bytes = total_bytes
+        self.bytes_sent = 0
+        self.state = 'pending'
+        self.message = ''
+        self.started_at = time.time()
+        self.upload_started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def set_state(self, state):
+        with self._lock:
+            self.state = state
+            if state == 'uploading' and self.upload_started_at is None:
+                self.upload_started_at = time.time()
+
+    def update(self, bytes_sent):
+        """Record the number of file bytes sent so far (streaming callback)."""
+        with self._lock:
+            self.bytes_sent = bytes_sent
+
+    def finish(self, success, message=''):
+        """Mark the upload finished and record its throughput."""
+        with self._lock:
+            self.state = 'done' if success else 'failed'
+            self.message = message
+            self.finished_at = time.time()
+        # Reused files and uploads that failed before streaming sent no bytes to measure
+        if self.upload_started_at is not None:
+            record_upload_stats(self)
+
+    def _upload_seconds(self):
+        if self.upload_started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.upload_started_at
+
+    def to_dict(self):
+        with self._lock:
+            seconds = self._upload_seconds()
+            rate = self.bytes_sent / seconds if seconds > 0 else 0.0
+            remaining = max(self.total_bytes - self.bytes_sent, 0)
+            return {
+                'upload_id': self.upload_id,
+                'course_id': self.course_id,
+                'filename': self.filename,
+                'state': self.state,
+                'message': self.message,
+                'bytes_sent': self.bytes_sent,
+                'total_bytes': self.total_bytes,
+                'percent': round(100.0 * self.bytes_sent / self.total_bytes, 1) if self.total_bytes else 0.0,
+                'mb_per_s': round(rate / (1024 * 1024), 2),
+                'eta_seconds': round(remaining / rate, 1) if rate > 0 and self.state == 'uploading' else None,
+                'elapsed_seconds': round((self.finished_at or time.time()) - self.started_at, 1)
+            }
+
+
+def create_upload_progress(upload_id, course_id, filename, total_bytes=0):
+    """Register and return a new UploadProgress, pruning old finished entries."""
+    progress = UploadProgress(upload_id, course_id, filename, total_bytes)
+    now = time.time()
+    with _uploads_lock:
+        for key in [k for k, p in _uploads.items()
+                    if p.finished_at and now - p.finished_at > PROGRESS_RETENTION]:
+            del _uploads[key]
+        _uploads[upload_id] = progress
+    return progress
+
+
+def get_upload_progress(upload_id):
+    """Return the UploadProgress for an id, or None if unknown."""
+    with _uploads_lock:
+        return _uploads.get(upload_id)
+
+
+def record_upload_stats(progress):
+    """Append the throughput of a finished upload to the stats file."""
+    stats = progress.to_dict()
+    entry = {
+        'timestamp': progress.finished_at,
+        'course_id': progress.course_id,
+        'filename': progress.filename,
+        'bytes': progress.bytes_sent,
+        'seconds': round(progress._upload_seconds(), 2),
+        'mb_per_s': stats['mb_per_s'],
+        'success': progress.state == 'done'
+    }
+    try:
+        config_dir = get_user_config_dir()
+        config_dir.mkdir(parents=True, exist_ok=True)
+        stats_file = config_dir / STATS_FILENAME
+        with _stats_lock:
+            with open(stats_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                size = f.tell()
+            if size > STATS_MAX_BYTES:
+                _trim_stats_file(stats_file)
+    except IOError as e:
+        print(f"Warning: Could not record upload stats: {e}")
+
+
+def _trim_stats_file(stats_file):
+    # Called with _stats_lock held
+    with open(stats_file, 'r', encoding='utf-8') as f:
+        lines = deque(f, maxlen=STATS_KEEP_ENTRIES)
+    tmp_file = str(stats_file) + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(tmp_file, stats_file)
+
+
+def get_upload_stats(limit=50):
+    """Return the most recent recorded uploads, newest last."""
+    stats_file = get_user_config_dir() / STATS_FILENAME
+    if not stats_file.exists():
+        return []
+    with _stats_lock, open(stats_file, 'r', encoding='utf-8') as f:
+        lines = deque(f, maxlen=limit)
+    stats = []
+    for line in lines:
+        try:
+            stats.append(json.loads(line))
+        except ValueError:
+            continue
+    return stats
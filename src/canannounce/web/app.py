@@ -1,20 +1,42 @@
 """
 Main Flask web application for Canvas announcements.
+
+create_app() is the single app factory used by both entry points: the web
+server (run.py --web, canannounce-web) and the PyQt window, which runs
+web/run_app.py in a subprocess. Canvas data for the routes comes from the
+shared CourseDataService.
 """
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, stream_template, request, jsonify, redirect, url_for
 import os
 from datetime import datetime, timedelta, timezone
 import sys
 
 # Fix imports to work with your project structure
 # Use relative imports for modules within the canannounce package
+from .. import config
 from ..utils.announcement_utils import upload_file_to_course, calculate_trimmed_title
-from ..core.course_utils import get_upcoming_assignments, get_canvas_courses, get_course_details
-from ..utils.quiz_utils import get_next_quiz_question
+from ..utils.upload_progress import get_upload_progress, get_upload_stats
+from ..utils.upload_jobs import UploadJobQueue
 from ..config.settings_manager import settings_manager
+from ..core.canvas_client import get_cache_stats, get_rate_limit_stats, clear_response_caches
+from .course_service import CourseDataService
+
+
+def get_config_value(key, default=None):
+    """Get the current value of a setting, including any user overrides."""
+    return settings_manager.get_setting(key, getattr(config, key, default))
+
 
 # Create Flask app
-def create_app():
+def create_app(get_setting=get_config_value):
+    """
+    Create the Flask app.
+
+    Args:
+        get_setting (callable): Returns the current value of a setting, called
+            as get_setting(key, default). Defaults to the settings manager with
+            local_settings.py as fallback.
+    """
     # Use the templates in the web/templates directory
     template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'templates'))
     static_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'static'))
@@ -28,36 +50,43 @@ def create_app():
     # Enable debugging
     app.config['DEBUG'] = True
 
-    # Load settings dynamically
-    def get_config_value(key, default=None):
-        return settings_manager.get_setting(key, default)
+    course_service = CourseDataService(get_setting)
+
+    # Uploads run in the background so /submit returns immediately
+    upload_queue = UploadJobQueue(
+        lambda: (get_setting('canvas_token'), get_setting('canvas_base_url'))
+    )
+
+    @app.before_request
+    def resume_upload_jobs():
+        # Resume on the first request so the reloader's parent process never runs jobs
+        upload_queue.resume_pending()
+
+    @app.route('/select_course')
+    def select_course():
+        # Get filtered courses for the selection screen
+        filtered_courses = course_service.get_filtered_courses()
+        # Prefetch course data in the background while the instructor picks a course
+        course_service.warm_course_data([course['id'] for course in filtered_courses])
+        return render_template('select_course.html', courses=filtered_courses)
 
     @app.route('/')
     def index():
         # If no course_id provided, redirect to course selection
         if not request.args.get('course_id'):
-            # Get courses for the selection screen
-            courses = get_canvas_courses(get_config_value('canvas_token'), get_config_value('canvas_base_url'))
-            return render_template('select_course.html', courses=courses)
+            return redirect(url_for('select_course'))
 
         # Process course-specific view
         course_id = request.args.get('course_id')
-        course_name = request.args.get('course_name', 'Unnamed Course')
-        upcoming_assignments = get_upcoming_assignments(
-            get_config_value('canvas_token'),
-            get_config_value('canvas_base_url'),
-            course_id
-        )
+        # The course picker passes the name; it is only looked up in Canvas when missing
+        course_name = request.args.get('course_name')
+        if course_name == 'Unnamed Course':
+            course_name = None
 
-        # Fetch course details if course_name is missing
-        if course_name == 'Unnamed Course' and course_id:
-            course_details = get_course_details(
-                get_config_value('canvas_token'),
-                get_config_value('canvas_base_url'),
-                course_id
-            )
-            if course_details and 'name' in course_details:
-                course_name = course_details['name']
+        # Check if data was preloaded
+        preloaded = request.args.get('preloaded') == 'true'
+        assignments_html = request.args.get('assignments_html', '')
+        quiz_html = request.args.get('quiz_html', '')
 
         # Determine publish date - default to 5 minutes from now in CDT
         cdt = timezone(timedelta(hours=-5))  # CDT is UTC-5
@@ -66,60 +95,59 @@ def create_app():
         # Format for datetime-local input
         default_publish_datetime = future_date_cdt.strftime('%Y-%m-%dT%H:%M')
 
-        # Prepare default body text
-        default_body = "<p><a href='[FILE_URL_PLACEHOLDER]'>Today's slides are here</a></p>\n\n<p>ENTER BODY TEXT</p>\n\n"
+        # Calculate default title immediately (fast operation)
+        default_title = calculate_trimmed_title(course_name) if course_name else ''
 
-        # Debug output for assignments
-        print(f"Upcoming assignments count: {len(upcoming_assignments) if upcoming_assignments else 0}")
-        if upcoming_assignments:
-            assignments_html = []
-            for assignment in upcoming_assignments:
-                # Get the formatted due date
-                due_date = assignment['due_at_formatted'] if 'due_at_formatted' in assignment else assignment['due_at']
-
-                # Create hyperlink if html_url is available, otherwise just use the name
-                if 'html_url' in assignment and assignment['html_url']:
-                    assignment_link = f'<a href="{assignment["html_url"]}" target="_blank">{assignment["name"]}</a>'
-                else:
-                    assignment_link = assignment['name']
-
-                # Add the list item with hyperlinked assignment name
-                assignments_html.append(f"<li>{assignment_link} (Due: {due_date})</li>")
+        # Build the body content
+        default_body = "<p><a href='[FILE_URL_PLACEHOLDER]'>Today's slides are here</a></p>\n\n<p>ENTER BODY TEXT</p>\n\n"
 
-            # Join all list items and add to the default body
-            default_body += f"<p><b>Upcoming Assignments:</b></p>\n<ul>\n{''.join(assignments_html)}\n</ul>"
-            print(f"Added hyperlinked assignments HTML")
+        if preloaded and (assignments_html or quiz_html):
+            # Use preloaded data
+            default_body += assignments_html + quiz_html
+            print(f"Using preloaded data for course {course_id}")
         else:
-            # Add message when no assignments are found
-            default_body += f"<p><b>No Assignments are due in the next {get_config_value('UPCOMING_ASSIGNMENT_DAYS', 30)} Days</b></p>\n\n"
-            print("No upcoming assignments found, added message to body")
-
-        # Calculate default title
-        default_title = calculate_trimmed_title(course_name)
-
-        # Fetch quiz question if enabled
-        quiz_question = None
-        if get_config_value('INCLUDE_QUIZ_QUESTION', True):
-            quiz_question = get_next_quiz_question(course_id)
-            if quiz_question:
-                default_body += f"\n\n<p><b>{get_config_value('QUIZ_QUESTION_PROMPT', 'Practice Question')}:</b> {quiz_question}</p>"
-                print(f"Added quiz question: {quiz_question[:100]}...")
-
-        # Debug output of full default_body
-        print(f"Full default_body content: {default_body}")
-
-        # Render the modal template instead of select_course.html
-        return render_template('modal.html',
+            # No preloaded data - the modal loads it from /api/course_data
+            print(f"No preloaded data for course {course_id}, will load via AJAX")
+
+        def load_deferred():
+            """Canvas lookups the form does not wait for; rendered at the end of the stream."""
+            # Headers are already sent, so failures are logged rather than raised
+            deferred = {'other_courses': []}
+            try:
+                deferred['other_courses'] = [
+                    {'id': course['id'], 'name': course.get('name', '')}
+                    for course in course_service.get_filtered_courses()
+                    if str(course['id']) != str(course_id)
+                ]
+                if not course_name:
+                    name = course_service.get_course_name(course_id)
+                    deferred['course_name'] = name
+                    deferred['default_title'] = calculate_trimmed_title(name)
+            except Exception as e:
+                print(f"Error loading deferred modal data for course {course_id}: {e}")
+            return deferred
+
+        # Stream the modal so the form is on screen before the course list and
+        # any missing course name have been fetched from Canvas
+        return stream_template('modal.html',
                             course_id=course_id,
                             course_name=course_name,
                             default_title=default_title,
                             default_body=default_body,
                             default_publish_datetime=default_publish_datetime,
-                            now=get_config_value('ANNOUNCEMENT_NOW', False),
-                            tinymce_api_key=get_config_value('TINYMCE_API_KEY'),
-                            upcoming_assignments=upcoming_assignments,
-                            quiz_question=quiz_question,
-                            quiz_question_prompt=get_config_value('QUIZ_QUESTION_PROMPT', 'Practice Question'))
+                            now=get_setting('ANNOUNCEMENT_NOW', False),
+                            tinymce_api_key=get_setting('TINYMCE_API_KEY', ''),
+                            upcoming_assignments=[],  # Not needed anymore since we have HTML
+                            quiz_question=None,  # Not needed anymore since we have HTML
+                            quiz_question_prompt=get_setting('QUIZ_QUESTION_PROMPT', 'Practice Question'),
+                            upcoming_assignment_days=get_setting('UPCOMING_ASSIGNMENT_DAYS', 30),
+                            load_deferred=load_deferred,  # Called by the template after the form is sent
+                            preloaded=preloaded)  # Pass this to template for conditional loading
+
+    @app.route('/api/course_data/<course_id>')
+    def get_course_data(course_id):
+        """Get assignments and quiz questions for a course asynchronously."""
+        return jsonify(course_service.get_course_data_html(course_id))
 
     @app.route('/settings')
     def settings():
@@ -158,12 +186,19 @@ def create_app():
                         settings_data[key] = value
 
             success = settings_manager.save_user_settings(settings_data)
+            # Cached Canvas responses may no longer match the new settings
+            clear_response_caches()
+
+            # Log the settings change for debugging
+            print(f"Settings saved: {settings_data}")
+            if 'UPCOMING_ASSIGNMENT_DAYS' in settings_data:
+                print(f"UPCOMING_ASSIGNMENT_DAYS changed to: {settings_data['UPCOMING_ASSIGNMENT_DAYS']}")
 
             if request.is_json:
-                return jsonify({'success': success})
+                return jsonify({'success': success, 'cache_invalidated': True})
             else:
                 if success:
-                    return redirect(url_for('settings', message='Settings saved successfully', message_type='success'))
+                    return redirect(url_for('settings', message='Settings saved successfully. Assignment cache has been cleared.', message_type='success'))
                 else:
                     return redirect(url_for('settings', message='Error saving settings', message_type='danger'))
 
@@ -179,7 +214,6 @@ def create_app():
         """Reset user settings to defaults."""
         try:
             # Remove user settings file
-            import os
             if os.path.exists(settings_manager.user_settings_file):
                 os.remove(settings_manager.user_settings_file)
 
@@ -222,18 +256,56 @@ def create_app():
         if file.filename == '':
             return jsonify({'success': False, 'error': 'No file selected'})
 
-        # Process the upload using the existing function
-        result = upload_file_to_course(
-            course_id=course_id,
+        # Additional courses ticked under "Also post to" get the same announcement
+        course_ids = [course_id] + [c for c in request.form.getlist('course_ids') if c and c != course_id]
+
+        # Queue the uploads and return immediately; the modal polls /api/jobs/<job_id>
+        jobs = upload_queue.submit_batch(
+            course_ids=course_ids,
             title=title,
             body=body,
             file=file,
-            publish_at=publish_date,  # Pass the publish_date to the function
-            token=get_config_value('canvas_token'),
-            base_url=get_config_value('canvas_base_url')
+            filename=file.filename,
+            publish_at=publish_date  # Pass the publish_date to the jobs
         )
 
-        return jsonify(result)
+        return jsonify({
+            'success': True,
+            'queued': True,
+            'job_id': jobs[0]['id'],
+            'job_ids': [job['id'] for job in jobs],
+            'message': f'Announcement queued for upload to {len(jobs)} course(s)'
+        })
+
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def api_job_status(job_id):
+        """Report the state, result and upload progress of a queued announcement."""
+        job = upload_queue.get_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Unknown job'}), 404
+        progress = get_upload_progress(job_id)
+        return jsonify({
+            'job_id': job['id'],
+            'course_id': job['course_id'],
+            'filename': job['filename'],
+            'state': job['state'],
+            'attempts': job['attempts'],
+            'result': job['result'],
+            'progress': progress.to_dict() if progress else None
+        })
+
+    @app.route('/api/upload_progress/<upload_id>', methods=['GET'])
+    def api_upload_progress(upload_id):
+        """Report bytes sent, MB/s and ETA for an upload in progress."""
+        progress = get_upload_progress(upload_id)
+        if progress is None:
+            return jsonify({'success': False, 'error': 'Unknown upload'}), 404
+        return jsonify(progress.to_dict())
+
+    @app.route('/api/upload_stats', methods=['GET'])
+    def api_upload_stats():
+        """Report throughput of recent uploads."""
+        return jsonify(get_upload_stats())
 
     # Existing upload route remains as a backup
     @app.route('/upload', methods=['POST'])
@@ -259,8 +331,8 @@ def create_app():
             body=body,
             file=file,
             publish_at=publish_at,
-            token=get_config_value('canvas_token'),
-            base_url=get_config_value('canvas_base_url')
+            token=get_setting('canvas_token'),
+            base_url=get_setting('canvas_base_url')
         )
 
         return jsonify(result)
@@ -268,8 +340,17 @@ def create_app():
     # Add a route for getting courses via API
     @app.route('/api/courses', methods=['GET'])
     def api_courses():
-        courses = get_canvas_courses(get_config_value('canvas_token'), get_config_value('canvas_base_url'))
-        return jsonify(courses)
+        return jsonify(course_service.get_filtered_courses())
+
+    @app.route('/api/cache_stats', methods=['GET'])
+    def api_cache_stats():
+        """Report Canvas response cache hit/miss counters."""
+        return jsonify(get_cache_stats())
+
+    @app.route('/api/rate_limit', methods=['GET'])
+    def api_rate_limit():
+        """Report the estimated Canvas rate limit bucket and how often requests were throttled."""
+        return jsonify(get_rate_limit_stats())
 
     return app
 
@@ -0,0 +1,272 @@
+"""
+Course data service shared by the web app routes.
+
+Everything the course picker and the announcement modal need from Canvas
+goes through one CourseDataService: the filtered course list is served from
+the on-disk cache and upcoming assignments from the course's assignment
+table, both refreshed in the background, the next quiz question is fetched alongside the assignments,
+and the picker warms every course's data before the instructor clicks.
+"""
+import asyncio
+import datetime as dt
+import html
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core.async_course_utils import run_blocking, run_with_timeout
+from ..core.course_data import get_courses_with_assignments
+from ..core.course_utils import get_canvas_courses, get_course_details, get_upcoming_assignments
+from ..core.disk_cache import get_disk_cache, cache_key, COURSES_MAX_AGE
+from ..utils import async_quiz_utils
+from ..utils.quiz_utils import get_next_quiz_pool
+
+# Per-leg timeouts in seconds for /api/course_data; slower legs are reported as missing
+ASSIGNMENTS_TIMEOUT = 15
+QUIZ_TIMEOUT = 10
+
+# Number of courses prefetched at once by the course picker warmup
+WARMUP_MAX_WORKERS = 3
+
+
+def simplify_assignments(upcoming):
+    """Reduce assignments from the assignment-window engine to the fields the modal uses."""
+    assignments = []
+    for assignment in upcoming:
+        due_date = dt.datetime.fromisoformat(assignment['due_at'].replace('Z', '+00:00'))
+        # Create a simplified version of the assignment object
+        assignments.append({
+            'name': assignment['name'],
+            'due_at': due_date.strftime('%Y-%m-%d %H:%M'),
+            'due_at_formatted': assignment['due_at_formatted'],
+            'points_possible': assignment.get('points_possible', 0),
+            'html_url': assignment.get('html_url', '')
+        })
+    return assignments
+
+
+class CourseDataService:
+    """
+    Cached access to course lists, assignments and quiz questions.
+
+    Args:
+        get_setting (callable): Returns the current value of a setting,
+            called as get_setting(key, default). Credentials are looked up
+            on every call, so saved settings take effect immediately.
+    """
+
+    def __init__(self, get_setting):
+        self.get_setting = get_setting
+        self._warmup_lock = threading.Lock()
+        self._warmup_running = False
+
+    @property
+    def token(self):
+        return self.get_setting('canvas_token', '')
+
+    @property
+    def base_url(self):
+        return self.get_setting('canvas_base_url', '')
+
+    def get_course_name(self, course_id, course_name=None):
+        """Return the course name passed by the picker, fetching it from Canvas if missing."""
+        if course_name and course_name != 'Unnamed Course':
+            return course_name
+        course_details = get_course_details(self.token, self.base_url, course_id)
+        if course_details and 'name' in course_details:
+            return course_details['name']
+        return 'Unnamed Course'
+
+    def get_upcoming_assignments(self, course_id, days_ahead=60):
+        """
+        Fetch upcoming assignments through the shared assignment-window engine
+        and simplify them for the modal.
+        """
+        try:
+            assignments = simplify_assignments(
+                get_upcoming_assignments(self.token, self.base_url, course_id, days=days_ahead)
+            )
+            print(f"DEBUG: Found {len(assignments)} upcoming assignments")
+            return assignments
+        except Exception as e:
+            print(f"DEBUG: Exception in get_upcoming_assignments: {str(e)}")
+            return []
+
+    def get_filtered_courses(self):
+        """
+        Return the filtered course list, rendered from the on-disk cache when
+        available and refreshed from Canvas in the background. With DATA_SOURCE
+        'graphql' the list comes from the batched course data query.
+        """
+        token, base_url = self.token, self.base_url
+
+        def fetch():
+            # An empty list usually means the fetch failed, so it is not cached
+            if self.get_setting('DATA_SOURCE', 'rest') == 'graphql':
+                return self.prefill_course_data(self.get_setting('UPCOMING_ASSIGNMENT_DAYS', 30)) or None
+            return get_canvas_courses(token, base_url) or None
+
+        courses = get_disk_cache().get_or_refresh(cache_key(token, base_url, 'courses'), fetch, COURSES_MAX_AGE)
+        return courses or []
+
+    def prefill_course_data(self, days_ahead):
+        """
+        Load the course list and every course's assignments with one batched
+        fetch (GraphQL when DATA_SOURCE is 'graphql'). The assignments are
+        written through each course's assignment table, so the per-course
+        lookups that follow are answered locally.
+
+        Returns:
+            list: The filtered course list
+        """
+        courses, _ = get_courses_with_assignments(self.token, self.base_url, days=days_ahead,
+                                                  data_source=self.get_setting('DATA_SOURCE', 'rest'))
+        return courses
+
+    async def load_course_data(self, course_id, days_ahead, include_quiz):
+        """
+        Fetch upcoming assignments and the next quiz question for a course concurrently,
+        so the modal waits for the slowest call rather than the sum of both.
+        Each leg has its own timeout, so assignments are still returned if the
+        quiz fetch is slow or fails.
+
+        Returns:
+            dict: 'assignments', 'quiz_question', plus per-leg 'timings' (ms) and 'errors'
+        """
+        start = time.perf_counter()
+
+        assignments = run_with_timeout(
+            run_blocking(self.get_upcoming_assignments, course_id, days_ahead),
+            ASSIGNMENTS_TIMEOUT,
+            default=[]
+        )
+
+        if include_quiz:
+            quiz_question = run_with_timeout(async_quiz_utils.get_next_quiz_question(course_id), QUIZ_TIMEOUT)
+        else:
+            quiz_question = asyncio.sleep(0, result=(None, 0.0, None))
+
+        (assignments, assignments_ms, assignments_error), (quiz_question, quiz_ms, quiz_error) = \
+            await asyncio.gather(assignments, quiz_question)
+
+        errors = {}
+        if assignments_error:
+            errors['assignments'] = assignments_error
+        if quiz_error:
+            errors['quiz'] = quiz_error
+
+        return {
+            'assignments': assignments,
+            'quiz_question': quiz_question,
+            'timings': {
+                'assignments_ms': assignments_ms,
+                'quiz_ms': quiz_ms,
+                'total_ms': round((time.perf_counter() - start) * 1000, 1)
+            },
+            'errors': errors
+        }
+
+    def get_course_data_html(self, course_id):
+        """
+        Build the assignments and quiz question sections of the announcement body.
+
+        Returns:
+            dict: The /api/course_data response.
+        """
+        # Get current settings dynamically
+        current_assignment_days = self.get_setting('UPCOMING_ASSIGNMENT_DAYS', 30)
+        current_include_quiz = self.get_setting('INCLUDE_QUIZ_QUESTION', False)
+        current_quiz_prompt = self.get_setting('QUIZ_QUESTION_PROMPT', 'Practice Question')
+
+        try:
+            # Fetch upcoming assignments and the quiz question concurrently
+            course_data = asyncio.run(
+                self.load_course_data(course_id, current_assignment_days, current_include_quiz)
+            )
+        except Exception as e:
+            print(f"Error fetching course data: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'assignments_html': f"<p><b>No Assignments are due in the next {current_assignment_days} Days</b></p>\n\n",
+                'quiz_html': ""
+            }
+
+        upcoming_assignments = course_data['assignments']
+        quiz_question = course_data['quiz_question']
+        if course_data['errors']:
+            print(f"Partial course data for {course_id}: {course_data['errors']}")
+
+        # Build assignments HTML
+        if upcoming_assignments:
+            assignments_list = []
+            for assignment in upcoming_assignments:
+                # Get the formatted due date
+                due_date = assignment['due_at_formatted'] if 'due_at_formatted' in assignment else assignment['due_at']
+
+                # Create hyperlink if html_url is available, otherwise just use the name
+                if 'html_url' in assignment and assignment['html_url']:
+                    assignment_link = f'<a href="{assignment["html_url"]}" target="_blank">{assignment["name"]}</a>'
+                else:
+                    assignment_link = assignment['name']
+
+                # Add the list item with hyperlinked assignment name
+                assignments_list.append(f"<li>{assignment_link} (Due: {due_date})</li>")
+
+            assignments_html = f"<p><b>Upcoming Assignments:</b></p>\n<ul>\n{''.join(assignments_list)}\n</ul>"
+        else:
+            assignments_html = f"<p><b>No Assignments are due in the next {current_assignment_days} Days</b></p>\n\n"
+
+        # Build quiz question HTML
+        quiz_html = ""
+        if quiz_question:
+            # Questions are plain text with entities decoded, so they are escaped
+            # before going into the announcement HTML
+            quiz_html = f"\n\n<p><b>{current_quiz_prompt}:</b> {html.escape(quiz_question)}</p>"
+
+        return {
+            'success': True,
+            'assignments_html': assignments_html,
+            'quiz_html': quiz_html,
+            'assignments_count': len(upcoming_assignments) if upcoming_assignments else 0,
+            'partial': bool(course_data['errors']),
+            'errors': course_data['errors'],
+            'timings': course_data['timings']
+        }
+
+    def warm_course_data(self, course_ids):
+        """
+        Prefetch assignments and next-quiz data for every course in the background,
+        so clicking a course in the picker opens the modal with data already cached.
+        Only one warmup runs at a time; later calls while it runs are ignored.
+        """
+        with self._warmup_lock:
+            if self._warmup_running or not course_ids:
+                return
+            self._warmup_running = True
+
+        days_ahead = self.get_setting('UPCOMING_ASSIGNMENT_DAYS', 30)
+        include_quiz = self.get_setting('INCLUDE_QUIZ_QUESTION', False)
+
+        def warm_course(course_id):
+            try:
+                self.get_upcoming_assignments(course_id, days_ahead)
+                if include_quiz:
+                    # Loads the question pool without drawing a question from the sampler
+                    get_next_quiz_pool(course_id)
+            except Exception as e:
+                print(f"Error prefetching data for course {course_id}: {e}")
+
+        def run():
+            start = time.perf_counter()
+            try:
+                # With DATA_SOURCE 'graphql' the course list query already stored
+                # every course's assignments, so these are answered locally
+                with ThreadPoolExecutor(max_workers=WARMUP_MAX_WORKERS) as executor:
+                    list(executor.map(warm_course, course_ids))
+                print(f"Prefetched data for {len(course_ids)} courses in {time.perf_counter() - start:.1f}s")
+            finally:
+                with self._warmup_lock:
+                    self._warmup_running = False
+
+        threading.Thread(target=run, daemon=True).start()